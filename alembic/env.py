@@ -21,6 +21,8 @@ import app.models.drivers
 import app.models.vehicles
 import app.models.erogations
 import app.models.totals
+import app.models.flow_profiles
+import app.models.rollups
 #
 # By importing these before grabbing Base.metadata, we ensure that
 # Base.metadata.reflects all four tables.
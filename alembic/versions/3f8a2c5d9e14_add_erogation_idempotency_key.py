@@ -0,0 +1,30 @@
+"""add erogation idempotency key
+
+Revision ID: 3f8a2c5d9e14
+Revises: 7c1d4e9a2b63
+Create Date: 2026-10-16 15:37:02.118934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2c5d9e14'
+down_revision: Union[str, None] = '7c1d4e9a2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('erogations', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_unique_constraint('erogations_idempotency_key_key', 'erogations', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('erogations_idempotency_key_key', 'erogations', type_='unique')
+    op.drop_column('erogations', 'idempotency_key')
@@ -0,0 +1,39 @@
+"""add erogation profiles
+
+Revision ID: 7c1d4e9a2b63
+Revises: 01e0b215eefb
+Create Date: 2026-10-16 09:12:41.507318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d4e9a2b63'
+down_revision: Union[str, None] = '01e0b215eefb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('erogation_profiles',
+    sa.Column('erogation_id', sa.Integer(), nullable=False),
+    sa.Column('start_lag_s', sa.Float(), nullable=False),
+    sa.Column('duration_s', sa.Float(), nullable=False),
+    sa.Column('min_flow_lpm', sa.Float(), nullable=False),
+    sa.Column('avg_flow_lpm', sa.Float(), nullable=False),
+    sa.Column('peak_flow_lpm', sa.Float(), nullable=False),
+    sa.Column('bin_seconds', sa.Float(), nullable=False),
+    sa.Column('curve', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['erogation_id'], ['erogations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('erogation_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('erogation_profiles')
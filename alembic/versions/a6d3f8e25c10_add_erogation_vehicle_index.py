@@ -0,0 +1,28 @@
+"""add erogation vehicle index
+
+Revision ID: a6d3f8e25c10
+Revises: e4a7c2f91b58
+Create Date: 2026-10-16 20:47:12.630981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f8e25c10'
+down_revision: Union[str, None] = 'e4a7c2f91b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_erogations_vehicle_timestamp_id', 'erogations', ['vehicle_id', 'erogation_timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_erogations_vehicle_timestamp_id', table_name='erogations')
@@ -0,0 +1,30 @@
+"""add erogation keyset indexes
+
+Revision ID: b52e7f0c4a91
+Revises: 3f8a2c5d9e14
+Create Date: 2026-10-16 17:05:48.662170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e7f0c4a91'
+down_revision: Union[str, None] = '3f8a2c5d9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_erogations_timestamp_id', 'erogations', ['erogation_timestamp', 'id'], unique=False)
+    op.create_index('ix_erogations_side_timestamp_id', 'erogations', ['erogation_side', 'erogation_timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_erogations_side_timestamp_id', table_name='erogations')
+    op.drop_index('ix_erogations_timestamp_id', table_name='erogations')
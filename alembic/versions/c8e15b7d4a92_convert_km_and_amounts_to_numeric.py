@@ -0,0 +1,99 @@
+"""convert km and amounts to numeric
+
+Revision ID: c8e15b7d4a92
+Revises: a6d3f8e25c10
+Create Date: 2026-10-16 21:32:55.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e15b7d4a92'
+down_revision: Union[str, None] = 'a6d3f8e25c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+KM = "CASE WHEN trim({value}) ~ '^[0-9]{{1,9}}(\\.[0-9]+)?$' THEN round(CAST(trim({value}) AS NUMERIC))::integer END"
+AMOUNT = "round(CAST({value} AS NUMERIC), 2)"
+
+CONVERSIONS = {
+    'erogations': [
+        ('vehicle_total_km', sa.Integer(), KM),
+        ('dispensed_liters', sa.Numeric(10, 2), AMOUNT),
+        ('total_erogation_price', sa.Numeric(10, 2), AMOUNT),
+    ],
+    'vehicles': [
+        ('vehicle_total_km', sa.Integer(), 'coalesce(' + KM + ', 0)'),
+    ],
+}
+INDEXES = [
+    ('erogations', 'vehicle_total_km'),
+    ('erogations', 'dispensed_liters'),
+    ('erogations', 'total_erogation_price'),
+    ('vehicles', 'vehicle_total_km'),
+]
+
+
+def assignments(table, source):
+    return ', '.join(
+        f'{column}_new = {expression.format(value=source + column)}'
+        for column, _, expression in CONVERSIONS[table]
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # shadow columns are kept in sync by a trigger while existing rows are
+    # backfilled in short transactions, then swapped in under a brief lock
+    for table, conversions in CONVERSIONS.items():
+        for column, type_, _ in conversions:
+            op.add_column(table, sa.Column(f'{column}_new', type_, nullable=True))
+        sets = '; '.join(
+            f'NEW.{column}_new := {expression.format(value="NEW." + column)}'
+            for column, _, expression in conversions
+        )
+        op.execute(
+            f'CREATE FUNCTION {table}_numeric_sync() RETURNS trigger AS $$ '
+            f'BEGIN {sets}; RETURN NEW; END $$ LANGUAGE plpgsql'
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}_numeric_sync BEFORE INSERT OR UPDATE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {table}_numeric_sync()'
+        )
+
+    connection = op.get_bind()
+    with op.get_context().autocommit_block():
+        last_id = connection.execute(sa.text('SELECT coalesce(max(id), 0) FROM erogations')).scalar()
+        for start in range(0, last_id, BATCH_SIZE):
+            connection.execute(
+                sa.text(f'UPDATE erogations SET {assignments("erogations", "")} WHERE id > :start AND id <= :stop'),
+                {'start': start, 'stop': start + BATCH_SIZE}
+            )
+        connection.execute(sa.text(f'UPDATE vehicles SET {assignments("vehicles", "")}'))
+
+    for table, conversions in CONVERSIONS.items():
+        op.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+        op.execute(f'DROP TRIGGER {table}_numeric_sync ON {table}')
+        op.execute(f'DROP FUNCTION {table}_numeric_sync()')
+        for column, _, _ in conversions:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_new', new_column_name=column)
+
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(f'ix_{table}_{column}', table, [column], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
+    op.alter_column('vehicles', 'vehicle_total_km', type_=sa.String(), postgresql_using='vehicle_total_km::text')
+    op.alter_column('erogations', 'total_erogation_price', type_=sa.Float(), postgresql_using='total_erogation_price::double precision')
+    op.alter_column('erogations', 'dispensed_liters', type_=sa.Float(), postgresql_using='dispensed_liters::double precision')
+    op.alter_column('erogations', 'vehicle_total_km', type_=sa.String(), postgresql_using='vehicle_total_km::text')
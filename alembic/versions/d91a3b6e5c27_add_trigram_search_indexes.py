@@ -0,0 +1,46 @@
+"""add trigram search indexes
+
+Revision ID: d91a3b6e5c27
+Revises: b52e7f0c4a91
+Create Date: 2026-10-16 18:21:09.304512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91a3b6e5c27'
+down_revision: Union[str, None] = 'b52e7f0c4a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('drivers', 'card'),
+    ('drivers', 'company'),
+    ('drivers', 'driver_full_name'),
+    ('vehicles', 'vehicle_id'),
+    ('vehicles', 'plate'),
+    ('erogations', 'card'),
+    ('erogations', 'company'),
+    ('erogations', 'driver_full_name'),
+    ('erogations', 'vehicle_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            f'ix_{table}_{column}_trgm', table, [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(TRIGRAM_INDEXES):
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
@@ -0,0 +1,54 @@
+"""add erogation rollups
+
+Revision ID: e4a7c2f91b58
+Revises: d91a3b6e5c27
+Create Date: 2026-10-16 20:04:37.118240
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2f91b58'
+down_revision: Union[str, None] = 'd91a3b6e5c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('erogation_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('erogation_side', sa.Integer(), nullable=False),
+    sa.Column('dispensed_product', sa.String(), nullable=False),
+    sa.Column('company', sa.String(), nullable=False),
+    sa.Column('card', sa.String(), nullable=False),
+    sa.Column('vehicle_id', sa.String(), nullable=False),
+    sa.Column('dispenses', sa.Integer(), nullable=False),
+    sa.Column('liters', sa.Numeric(precision=14, scale=3), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'erogation_side', 'dispensed_product', 'company', 'card', 'vehicle_id')
+    )
+    op.execute(sa.text(
+        """
+        INSERT INTO erogation_rollups
+            (day, erogation_side, dispensed_product, company, card, vehicle_id, dispenses, liters, amount)
+        SELECT CAST(timezone(:tz, erogation_timestamp) AS DATE), erogation_side,
+               coalesce(dispensed_product, ''), coalesce(company, ''), coalesce(card, ''), coalesce(vehicle_id, ''),
+               count(*),
+               coalesce(sum(CAST(dispensed_liters AS NUMERIC(14, 3))), 0),
+               coalesce(sum(CAST(total_erogation_price AS NUMERIC(14, 2))), 0)
+        FROM erogations
+        WHERE erogation_timestamp IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+    ).bindparams(tz=os.getenv("ROLLUP_TZ", "UTC")))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('erogation_rollups')
@@ -0,0 +1,129 @@
+"""partition erogations by month
+
+Revision ID: f3b9d27a61c4
+Revises: c8e15b7d4a92
+Create Date: 2026-10-17 09:14:26.551802
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d27a61c4'
+down_revision: Union[str, None] = 'c8e15b7d4a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 2
+COLUMNS = (
+    'id, card, company, driver_full_name, vehicle_id, company_vehicle, vehicle_total_km, erogation_side, '
+    'dispensed_liters, dispensed_product, erogation_timestamp, mode, total_erogation_price, idempotency_key'
+)
+INDEXES = [
+    ('ix_erogations_timestamp_id', ['erogation_timestamp', 'id'], {}),
+    ('ix_erogations_side_timestamp_id', ['erogation_side', 'erogation_timestamp', 'id'], {}),
+    ('ix_erogations_vehicle_timestamp_id', ['vehicle_id', 'erogation_timestamp', 'id'], {}),
+    ('ix_erogations_vehicle_total_km', ['vehicle_total_km'], {}),
+    ('ix_erogations_dispensed_liters', ['dispensed_liters'], {}),
+    ('ix_erogations_total_erogation_price', ['total_erogation_price'], {}),
+] + [
+    (f'ix_erogations_{column}_trgm', [column], {'postgresql_using': 'gin', 'postgresql_ops': {column: 'gin_trgm_ops'}})
+    for column in ('card', 'company', 'driver_full_name', 'vehicle_id')
+]
+
+
+def erogationColumns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('erogations_id_seq'::regclass)"), nullable=False),
+        sa.Column('card', sa.String(), nullable=True),
+        sa.Column('company', sa.String(), nullable=True),
+        sa.Column('driver_full_name', sa.String(), nullable=True),
+        sa.Column('vehicle_id', sa.String(), nullable=True),
+        sa.Column('company_vehicle', sa.String(), nullable=True),
+        sa.Column('vehicle_total_km', sa.Integer(), nullable=True),
+        sa.Column('erogation_side', sa.Integer(), nullable=False),
+        sa.Column('dispensed_liters', sa.Numeric(10, 2), nullable=True),
+        sa.Column('dispensed_product', sa.String(), nullable=True),
+        sa.Column('erogation_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('mode', sa.String(), nullable=False),
+        sa.Column('total_erogation_price', sa.Numeric(10, 2), nullable=True),
+        sa.Column('idempotency_key', sa.String(), nullable=True),
+    ]
+
+
+def months(first, last):
+    start = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    while start <= last:
+        end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=timezone.utc)
+        yield start, end
+        start = end
+
+
+def createIndexes():
+    for name, columns, options in INDEXES:
+        op.create_index(name, 'erogations', columns, unique=False, **options)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('ALTER TABLE erogations RENAME TO erogations_unpartitioned')
+    op.execute('ALTER TABLE erogations_unpartitioned RENAME CONSTRAINT erogations_pkey TO erogations_unpartitioned_pkey')
+    op.execute('ALTER SEQUENCE erogations_id_seq OWNED BY NONE')
+    # a foreign key can't reference a partitioned table without the partition key
+    op.drop_constraint('erogation_profiles_erogation_id_fkey', 'erogation_profiles', type_='foreignkey')
+
+    op.create_table('erogations',
+    *erogationColumns(),
+    sa.PrimaryKeyConstraint('id', 'erogation_timestamp'),
+    sa.UniqueConstraint('idempotency_key', 'erogation_timestamp', name='uq_erogations_idempotency_key'),
+    postgresql_partition_by='RANGE (erogation_timestamp)'
+    )
+
+    now = datetime.now(timezone.utc)
+    first = op.get_bind().execute(sa.text('SELECT min(erogation_timestamp) FROM erogations_unpartitioned')).scalar()
+    last = datetime(now.year + (now.month + PARTITIONS_AHEAD - 1) // 12, (now.month + PARTITIONS_AHEAD - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+    for start, end in months(min(first or now, now).astimezone(timezone.utc), last):
+        op.execute(
+            f"CREATE TABLE erogations_y{start.year:04d}m{start.month:02d} PARTITION OF erogations "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute('CREATE TABLE erogations_default PARTITION OF erogations DEFAULT')
+
+    op.execute(
+        f'INSERT INTO erogations ({COLUMNS}) '
+        f'SELECT {COLUMNS.replace("erogation_timestamp", "coalesce(erogation_timestamp, now())")} '
+        f'FROM erogations_unpartitioned'
+    )
+    op.execute('ALTER SEQUENCE erogations_id_seq OWNED BY erogations.id')
+    op.drop_table('erogations_unpartitioned')
+    createIndexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE erogations RENAME TO erogations_partitioned')
+    op.execute('ALTER TABLE erogations_partitioned RENAME CONSTRAINT erogations_pkey TO erogations_partitioned_pkey')
+    op.execute('ALTER SEQUENCE erogations_id_seq OWNED BY NONE')
+    for name, _, _ in INDEXES:
+        op.drop_index(name, table_name='erogations_partitioned')
+
+    columns = erogationColumns()
+    columns[10] = sa.Column('erogation_timestamp', sa.DateTime(timezone=True), nullable=True)
+    op.create_table('erogations',
+    *columns,
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key', name='erogations_idempotency_key_key')
+    )
+    op.execute(f'INSERT INTO erogations ({COLUMNS}) SELECT {COLUMNS} FROM erogations_partitioned')
+    op.execute('ALTER SEQUENCE erogations_id_seq OWNED BY erogations.id')
+    op.drop_table('erogations_partitioned')
+    createIndexes()
+    op.execute('DELETE FROM erogation_profiles WHERE erogation_id NOT IN (SELECT id FROM erogations)')
+    op.create_foreign_key(
+        'erogation_profiles_erogation_id_fkey', 'erogation_profiles', 'erogations',
+        ['erogation_id'], ['id'], ondelete='CASCADE'
+    )
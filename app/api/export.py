@@ -0,0 +1,145 @@
+import csv
+import io
+import zlib
+from fastapi import HTTPException
+from typing import Literal
+
+from app.database import async_session
+from app.models.erogations import Erogation
+
+EXPORT_YIELD_PER = 1000
+EXPORT_BATCH_ROWS = 10000
+EXPORT_COLUMNS = [
+    Erogation.id,
+    Erogation.erogation_timestamp,
+    Erogation.erogation_side,
+    Erogation.card,
+    Erogation.company,
+    Erogation.driver_full_name,
+    Erogation.vehicle_id,
+    Erogation.company_vehicle,
+    Erogation.vehicle_total_km,
+    Erogation.dispensed_product,
+    Erogation.dispensed_liters,
+    Erogation.total_erogation_price,
+    Erogation.mode,
+]
+
+ColumnarFormat = Literal["parquet", "arrow"]
+COLUMNAR_MEDIA_TYPES = {
+    "parquet": ("application/vnd.apache.parquet", "erogazioni.parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "erogazioni.arrows"),
+}
+DICTIONARY_COLUMNS = {"company", "dispensed_product", "mode"}
+
+async def streamPartitions(query, batch_rows: int):
+    # the request session is already closed once the response body is sent,
+    # so the export holds its own session and server-side cursor
+    async with async_session() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_rows))
+        async for rows in result.partitions():
+            yield rows
+
+async def streamCsv(query, compress: bool = False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    async for rows in streamPartitions(query, EXPORT_YIELD_PER):
+        writer.writerows(rows)
+        chunk = drain()
+        if chunk:
+            yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+class ChunkSink(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def loadArrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Columnar export needs pyarrow installed on the server")
+    return pyarrow
+
+def erogationSchema(pa):
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("erogation_timestamp", pa.timestamp("us", tz="UTC")),
+        ("erogation_side", pa.int16()),
+        ("card", pa.string()),
+        ("company", dictionary),
+        ("driver_full_name", pa.string()),
+        ("vehicle_id", pa.string()),
+        ("company_vehicle", pa.string()),
+        ("vehicle_total_km", pa.int32()),
+        ("dispensed_product", dictionary),
+        ("dispensed_liters", pa.decimal128(10, 2)),
+        ("total_erogation_price", pa.decimal128(10, 2)),
+        ("mode", dictionary),
+    ])
+
+def recordBatch(pa, schema, rows):
+    columns = [list(values) for values in zip(*rows)]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name in DICTIONARY_COLUMNS:
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def openColumnarWriter(pa, export_format: ColumnarFormat, sink, schema):
+    if export_format == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+async def streamColumnar(query, export_format: ColumnarFormat, pa):
+    schema = erogationSchema(pa)
+    sink = ChunkSink()
+    writer = openColumnarWriter(pa, export_format, sink, schema)
+    async for rows in streamPartitions(query, EXPORT_BATCH_ROWS):
+        writer.write_batch(recordBatch(pa, schema, rows))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
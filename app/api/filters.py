@@ -0,0 +1,73 @@
+from fastapi import Query
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+
+from app.crud.search import applyFilters, freeTextSearch, rangeFilter
+from app.models.erogations import Erogation
+
+EROGATION_SEARCH_COLUMNS = [Erogation.card, Erogation.company, Erogation.driver_full_name, Erogation.vehicle_id]
+
+
+class ErogationFilters:
+    def __init__(
+        self,
+        card: Optional[str] = Query(None),
+        vehicle_id: Optional[str] = Query(None),
+        company: Optional[str] = Query(None),
+        erogation_side: Optional[int] = Query(None),
+        mode: Optional[str] = Query(None),
+        dispensed_product: Optional[str] = Query(None),
+        vehicle_total_km: Optional[int] = Query(None),
+        dispensed_liters: Optional[Decimal] = Query(None),
+        km_min: Optional[int] = Query(None),
+        km_max: Optional[int] = Query(None),
+        liters_min: Optional[Decimal] = Query(None),
+        liters_max: Optional[Decimal] = Query(None),
+        price_min: Optional[Decimal] = Query(None),
+        price_max: Optional[Decimal] = Query(None),
+        q: Optional[str] = Query(None, description="Free text matched on all indexed text fields, ranked by similarity"),
+        start_time: Optional[datetime] = Query(
+            None,
+            alias="start_time",
+            description="Start time in ISO-8601 format, e.g. 2025-04-26T10:50"
+        ),
+        end_time: Optional[datetime] = Query(
+            None,
+            alias="end_time",
+            description="End time in ISO-8601 format, e.g. 2025-04-26T10:52"
+        ),
+    ):
+        self.fields = {
+            "card": card,
+            "vehicle_id": vehicle_id,
+            "company": company,
+            "erogation_side": erogation_side,
+            "mode": mode,
+            "dispensed_product": dispensed_product,
+            "vehicle_total_km": vehicle_total_km,
+            "dispensed_liters": dispensed_liters,
+        }
+        self.ranges = [
+            (Erogation.vehicle_total_km, km_min, km_max),
+            (Erogation.dispensed_liters, liters_min, liters_max),
+            (Erogation.total_erogation_price, price_min, price_max),
+        ]
+        self.q = q
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def apply(self, query=None):
+        query = applyFilters(select(Erogation) if query is None else query, Erogation, self.fields)
+        for column, low, high in self.ranges:
+            query = rangeFilter(query, column, low, high)
+        ranking = None
+        if self.q:
+            query, ranking = freeTextSearch(query, EROGATION_SEARCH_COLUMNS, self.q)
+
+        if self.start_time:
+            query = query.where(Erogation.erogation_timestamp >= self.start_time)
+        if self.end_time:
+            query = query.where(Erogation.erogation_timestamp <= self.end_time)
+        return query, ranking
@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from fastapi import HTTPException, Response
+from pydantic import TypeAdapter
+from typing import Annotated, List, Literal, Optional
+from typing_extensions import TypedDict
+from sqlalchemy import DateTime, func, select, text, tuple_
+
+TotalMode = Literal["exact", "estimate", "none"]
+ESTIMATE_MIN_ROWS = 10000
+
+def encodeCursor(values) -> str:
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decodeCursor(cursor: str, columns):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def estimateRows(session, model) -> int:
+    estimate = await session.scalar(
+        # partitioned parents are never analyzed, so add up the leaves that have been
+        text(
+            "SELECT coalesce(sum(c.reltuples) FILTER (WHERE c.reltuples >= 0), -1)::bigint "
+            "FROM pg_partition_tree(CAST(:table AS regclass)) t JOIN pg_class c ON c.oid = t.relid "
+            "WHERE t.isleaf"
+        ),
+        {"table": model.__tablename__}
+    )
+    return estimate if estimate is not None else -1
+
+async def fetchPage(session, query, keys, page: int, limit: int, cursor: str = None,
+                    descending: bool = False, ranking=None, total_mode: TotalMode = "exact"):
+    base = query
+    total = None
+    if total_mode == "estimate" and base.whereclause is None:
+        estimate = await estimateRows(session, keys[0].class_)
+        if estimate >= ESTIMATE_MIN_ROWS:
+            total = estimate
+    counted = total_mode != "none" and total is None
+    window = counted and not cursor
+    if window:
+        query = query.add_columns(func.count().over())
+
+    if ranking is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available for ranked searches")
+        query = query.order_by(ranking)
+    query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+    if cursor:
+        values = decodeCursor(cursor, keys)
+        if len(keys) > 1:
+            position, bound = tuple_(*keys), tuple_(*values)
+        else:
+            position, bound = keys[0], values[0]
+        query = query.where(position < bound if descending else position > bound)
+    else:
+        query = query.offset((page - 1) * limit)
+
+    rows = (await session.execute(query.limit(limit + 1))).all()
+    # column selects keep their rows, PageEncoder reads them positionally and ignores the count
+    items = [row[0] for row in rows] if len(base.column_descriptions) == 1 else rows
+    if window:
+        if rows:
+            total = rows[0][-1]
+        elif page == 1:
+            total = 0
+    if counted and total is None:
+        total = await session.scalar(select(func.count()).select_from(base.subquery()))
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if ranking is None:
+            next_cursor = encodeCursor([getattr(items[-1], key.key) for key in keys])
+    return items, next_cursor, total, counted
+
+
+class PageEncoder:
+    def __init__(self, schema, model, keys=()):
+        self.fields = list(schema.model_fields)
+        # sort keys the schema leaves out are still selected for the next cursor
+        self.columns = [getattr(model, name) for name in self.fields] + [
+            key for key in keys if key.key not in self.fields
+        ]
+        row = TypedDict(f"{schema.__name__}Row", {
+            name: Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+            for name, field in schema.model_fields.items()
+        })
+        page = TypedDict(f"{schema.__name__}Page", {
+            "total": Optional[int],
+            "total_exact": bool,
+            "page": int,
+            "limit": int,
+            "items": List[row],
+            "next_cursor": Optional[str],
+        })
+        self.adapter = TypeAdapter(page)
+
+    def encode(self, rows, page: int, limit: int, next_cursor: str = None, total: int = None,
+               total_exact: bool = True) -> bytes:
+        return self.adapter.dump_json({
+            "total": total,
+            "total_exact": total_exact,
+            "page": page,
+            "limit": limit,
+            "items": [dict(zip(self.fields, row)) for row in rows],
+            "next_cursor": next_cursor,
+        })
+
+    def respond(self, rows, page: int, limit: int, next_cursor: str = None, total: int = None,
+                total_exact: bool = True) -> Response:
+        return Response(
+            content=self.encode(rows, page, limit, next_cursor, total, total_exact),
+            media_type="application/json",
+        )
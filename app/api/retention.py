@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.database import async_session
+from app.api.export import EXPORT_COLUMNS, streamCsv
+from app.crud.retention import countBefore, dropPartition, listPartitions, purgeBatch
+from app.models.erogations import Erogation
+from app.schemas.retention import PurgeStatus
+
+ARCHIVE_PATH = "data/archive"
+PURGE_PAUSE = 0.05
+
+
+class PurgeJob:
+    def __init__(self):
+        self.task = None
+        self.status = PurgeStatus()
+
+    def start(self, cutoff: datetime, archive: bool, batch_size: int) -> PurgeStatus:
+        if self.task is not None and not self.task.done():
+            raise HTTPException(status_code=409, detail="A purge is already running")
+        self.status = PurgeStatus(state="archiving" if archive else "dropping", cutoff=cutoff,
+                                  started_at=datetime.now(timezone.utc))
+        self.task = asyncio.create_task(self.run(cutoff, archive, batch_size))
+        return self.status
+
+    async def archive(self, cutoff: datetime) -> str:
+        path = Path(ARCHIVE_PATH)
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"erogations_before_{cutoff.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}.csv.gz"
+        query = select(*EXPORT_COLUMNS).where(Erogation.erogation_timestamp < cutoff).order_by(
+            Erogation.erogation_timestamp, Erogation.id
+        )
+        loop = asyncio.get_running_loop()
+        with open(path, 'wb') as f:
+            async for chunk in streamCsv(query, compress=True):
+                await loop.run_in_executor(None, f.write, chunk)
+            await loop.run_in_executor(None, f.flush)
+        return str(path)
+
+    async def run(self, cutoff: datetime, archive: bool, batch_size: int):
+        try:
+            async with async_session() as session:
+                self.status.rows_total = await countBefore(session, cutoff)
+            if archive:
+                self.status.archive_path = await self.archive(cutoff)
+
+            self.status.state = "dropping"
+            async with async_session() as session:
+                for name, _, end in await listPartitions(session):
+                    if end <= cutoff:
+                        self.status.rows_deleted += await dropPartition(session, name)
+                        self.status.partitions_dropped.append(name)
+
+            self.status.state = "deleting"
+            while True:
+                async with async_session() as session:
+                    deleted = await purgeBatch(session, cutoff, batch_size)
+                if not deleted:
+                    break
+                self.status.rows_deleted += deleted
+                self.status.batches += 1
+                await asyncio.sleep(PURGE_PAUSE)
+            self.status.state = "done"
+        except Exception as e:
+            self.status.state = "failed"
+            self.status.error = str(e)
+        finally:
+            self.status.finished_at = datetime.now(timezone.utc)
+
+
+purge_job = PurgeJob()
@@ -1,21 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, timezone
 
 from app.database import get_session
+from app.cache import response_cache
 from app.schemas import (
     drivers as drivers_schemas,
     vehicles as vehicles_schemas,
     erogations as erogations_schemas,
+    flow_profiles as flow_profiles_schemas,
+    rollups as rollups_schemas,
+    efficiency as efficiency_schemas,
+    retention as retention_schemas,
+    imports as imports_schemas,
+    batch as batch_schemas,
 )
 from app.schemas.pagination import Paginated
+from app.api.pagination import PageEncoder, fetchPage, TotalMode
+from app.api.filters import ErogationFilters
+from app.api.retention import purge_job
+from app.api.export import (
+    COLUMNAR_MEDIA_TYPES,
+    EXPORT_COLUMNS,
+    ColumnarFormat,
+    loadArrow,
+    streamColumnar,
+    streamCsv,
+)
 from app.crud import (
     drivers as drivers_crud,
     vehicles as vehicles_crud,
     erogations as erogations_crud,
+    flow_profiles as flow_profiles_crud,
+    rollups as rollups_crud,
+    efficiency as efficiency_crud,
+    imports as imports_crud,
+    batch as batch_crud,
 )
+from app.crud.efficiency import OUTLIER_RATIO
+from app.crud.retention import PURGE_BATCH_SIZE
+from app.crud.imports import ImportFormat
+from app.crud.rollups import RollupBucket, RollupGroup
+from app.crud.search import applyFilters, freeTextSearch, rangeFilter
 from app.models.drivers import Driver
 from app.models.vehicles import Vehicle
 from app.models.erogations import Erogation
@@ -25,6 +54,16 @@ from app.schemas.config import FullConfigSchema
 router = APIRouter()
 cfg_mgr = ConfigManager(config_path="config/config.json")
 
+EROGATION_KEYS = [Erogation.erogation_timestamp, Erogation.id]
+DRIVER_SEARCH_COLUMNS = [Driver.card, Driver.company, Driver.driver_full_name]
+VEHICLE_SEARCH_COLUMNS = [Vehicle.vehicle_id, Vehicle.plate]
+DRIVER_PAGE = PageEncoder(drivers_schemas.Driver, Driver)
+VEHICLE_PAGE = PageEncoder(vehicles_schemas.Vehicle, Vehicle)
+EROGATION_PAGE = PageEncoder(erogations_schemas.Erogation, Erogation, EROGATION_KEYS)
+
+def requestFormat(request: Request) -> ImportFormat:
+    return "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+
 @router.post("/drivers/", response_model=drivers_schemas.Driver)
 async def createDriver(
     driver: drivers_schemas.DriverCreate,
@@ -39,15 +78,14 @@ async def createDriver(
 async def listDrivers(
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
-    skip = (page - 1) * limit
-    total = await session.scalar(select(func.count()).select_from(Driver))
-    result = await session.execute(
-        select(Driver).offset(skip).limit(limit)
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, select(*DRIVER_PAGE.columns), [Driver.card], page, limit, cursor, total_mode=total_mode
     )
-    items = result.scalars().all()
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    return DRIVER_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
 
 @router.get("/drivers/{card}", response_model=drivers_schemas.Driver)
 async def getDriverByCard(
@@ -81,6 +119,42 @@ async def deleteDriver(
         raise HTTPException(status_code=404, detail="Driver not found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@router.post(
+    "/drivers/import",
+    response_model=imports_schemas.ImportReport,
+)
+async def importDrivers(
+    request: Request,
+    import_format: Optional[ImportFormat] = Query(None, alias="format", description="csv or ndjson, guessed from Content-Type when omitted"),
+    session: AsyncSession = Depends(get_session),
+):
+    body = await request.body()
+    return await imports_crud.bulkUpsert(session, "drivers", body, import_format or requestFormat(request))
+
+@router.post(
+    "/drivers/batch-update",
+    response_model=batch_schemas.BatchResult,
+)
+async def batchUpdateDrivers(
+    batch: batch_schemas.DriverBatchUpdate,
+    session: AsyncSession = Depends(get_session),
+):
+    affected = await batch_crud.batchUpdate(
+        session, "drivers", batch.where.model_dump(), batch.values.model_dump(exclude_unset=True)
+    )
+    return batch_schemas.BatchResult(affected=affected)
+
+@router.post(
+    "/drivers/batch-delete",
+    response_model=batch_schemas.BatchResult,
+)
+async def batchDeleteDrivers(
+    where: batch_schemas.DriverBatchFilter,
+    session: AsyncSession = Depends(get_session),
+):
+    affected = await batch_crud.batchDelete(session, "drivers", where.model_dump())
+    return batch_schemas.BatchResult(affected=affected)
+
 @router.get(
     "/drivers/search/",
     response_model=Paginated[drivers_schemas.Driver],
@@ -91,8 +165,11 @@ async def searchDrivers(
     driver_full_name: Optional[str] = Query(None),
     request_pin: Optional[bool] = Query(None),
     request_vehicle_id: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, description="Free text matched on all indexed text fields, ranked by similarity"),
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
     filters = {
@@ -102,21 +179,15 @@ async def searchDrivers(
         "request_pin": request_pin,
         "request_vehicle_id": request_vehicle_id,
     }
-    query = select(Driver)
-    for attr, val in filters.items():
-        if val is None:
-            continue
-        column = getattr(Driver, attr)
-        if isinstance(val, bool):
-            query = query.where(column == val)
-        else:
-            query = query.where(column.ilike(f"%{val}%"))
-
-    total = await session.scalar(select(func.count()).select_from(query.subquery()))
-    skip = (page - 1) * limit
-    result = await session.execute(query.offset(skip).limit(limit))
-    items = result.scalars().all()
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    query = applyFilters(select(*DRIVER_PAGE.columns), Driver, filters)
+    ranking = None
+    if q:
+        query, ranking = freeTextSearch(query, DRIVER_SEARCH_COLUMNS, q)
+
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, query, [Driver.card], page, limit, cursor, ranking=ranking, total_mode=total_mode
+    )
+    return DRIVER_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
 
 @router.post("/vehicles/", response_model=vehicles_schemas.Vehicle)
 async def createVehicle(
@@ -132,13 +203,14 @@ async def createVehicle(
 async def listVehicles(
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
-    skip = (page - 1) * limit
-    total = await session.scalar(select(func.count()).select_from(Vehicle))
-    result = await session.execute(select(Vehicle).offset(skip).limit(limit))
-    items = result.scalars().all()
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, select(*VEHICLE_PAGE.columns), [Vehicle.vehicle_id], page, limit, cursor, total_mode=total_mode
+    )
+    return VEHICLE_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
 
 @router.get("/vehicles/{vehicle_id}", response_model=vehicles_schemas.Vehicle)
 async def getVehicleById(
@@ -183,6 +255,42 @@ async def deleteVehicle(
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@router.post(
+    "/vehicles/import",
+    response_model=imports_schemas.ImportReport,
+)
+async def importVehicles(
+    request: Request,
+    import_format: Optional[ImportFormat] = Query(None, alias="format", description="csv or ndjson, guessed from Content-Type when omitted"),
+    session: AsyncSession = Depends(get_session),
+):
+    body = await request.body()
+    return await imports_crud.bulkUpsert(session, "vehicles", body, import_format or requestFormat(request))
+
+@router.post(
+    "/vehicles/batch-update",
+    response_model=batch_schemas.BatchResult,
+)
+async def batchUpdateVehicles(
+    batch: batch_schemas.VehicleBatchUpdate,
+    session: AsyncSession = Depends(get_session),
+):
+    affected = await batch_crud.batchUpdate(
+        session, "vehicles", batch.where.model_dump(), batch.values.model_dump(exclude_unset=True)
+    )
+    return batch_schemas.BatchResult(affected=affected)
+
+@router.post(
+    "/vehicles/batch-delete",
+    response_model=batch_schemas.BatchResult,
+)
+async def batchDeleteVehicles(
+    where: batch_schemas.VehicleBatchFilter,
+    session: AsyncSession = Depends(get_session),
+):
+    affected = await batch_crud.batchDelete(session, "vehicles", where.model_dump())
+    return batch_schemas.BatchResult(affected=affected)
+
 @router.get(
     "/vehicles/search/",
     response_model=Paginated[vehicles_schemas.Vehicle],
@@ -190,11 +298,16 @@ async def deleteVehicle(
 async def searchVehicles(
     vehicle_id: Optional[str] = Query(None),
     company_vehicle: Optional[str] = Query(None),
-    vehicle_total_km: Optional[str] = Query(None),
+    vehicle_total_km: Optional[int] = Query(None),
+    km_min: Optional[int] = Query(None),
+    km_max: Optional[int] = Query(None),
     plate: Optional[str] = Query(None),
     request_vehicle_km: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, description="Free text matched on all indexed text fields, ranked by similarity"),
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
     filters = {
@@ -204,20 +317,15 @@ async def searchVehicles(
         "plate": plate,
         "request_vehicle_km": request_vehicle_km,
     }
-    query = select(Vehicle)
-    for attr, val in filters.items():
-        if val is None:
-            continue
-        column = getattr(Vehicle, attr)
-        if isinstance(val, (bool, int, float)):
-            query = query.where(column == val)
-        else:
-            query = query.where(column.ilike(f"%{val}%"))
-    total = await session.scalar(select(func.count()).select_from(query.subquery()))
-    skip = (page - 1) * limit
-    result = await session.execute(query.offset(skip).limit(limit))
-    items = result.scalars().all()
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    query = applyFilters(select(*VEHICLE_PAGE.columns), Vehicle, filters)
+    query = rangeFilter(query, Vehicle.vehicle_total_km, km_min, km_max)
+    ranking = None
+    if q:
+        query, ranking = freeTextSearch(query, VEHICLE_SEARCH_COLUMNS, q)
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, query, [Vehicle.vehicle_id], page, limit, cursor, ranking=ranking, total_mode=total_mode
+    )
+    return VEHICLE_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
 
 @router.post("/erogations/", response_model=erogations_schemas.Erogation)
 async def createErogation(
@@ -233,81 +341,133 @@ async def createErogation(
 async def listErogations(
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
-    skip = (page - 1) * limit
-    total = await session.scalar(select(func.count()).select_from(Erogation))
-    stmt = (
-        select(Erogation)
-        .order_by(Erogation.erogation_timestamp.desc())
-        .offset(skip)
-        .limit(limit)
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, select(*EROGATION_PAGE.columns), EROGATION_KEYS, page, limit, cursor, descending=True, total_mode=total_mode
     )
-    result = await session.execute(stmt)
-    items = result.scalars().all()
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    return EROGATION_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
 
 @router.get(
     "/erogations/search/",
     response_model=Paginated[erogations_schemas.Erogation],
 )
 async def searchErogazioni(
-    card: Optional[str] = Query(None),
-    vehicle_id: Optional[str] = Query(None),
-    company: Optional[str] = Query(None),
-    erogation_side: Optional[int] = Query(None),
-    mode: Optional[str] = Query(None),
-    dispensed_product: Optional[str] = Query(None),
-    vehicle_total_km: Optional[str] = Query(None),
-    dispensed_liters: Optional[float] = Query(None),
-    start_time: Optional[datetime] = Query(
-        None,
-        alias="start_time",
-        description="Start time in ISO-8601 format, e.g. 2025-04-26T10:50"
-    ),
-    end_time: Optional[datetime] = Query(
-        None,
-        alias="end_time",
-        description="End time in ISO-8601 format, e.g. 2025-04-26T10:52"
-    ),
+    filters: ErogationFilters = Depends(),
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor of the previous page, replaces page"),
+    total_mode: TotalMode = Query("exact", description="exact: window count, estimate: planner estimate for large unfiltered tables, none: skip the total"),
     session: AsyncSession = Depends(get_session),
 ):
-    query = select(Erogation)
+    query, ranking = filters.apply(select(*EROGATION_PAGE.columns))
 
+    items, next_cursor, total, total_exact = await fetchPage(
+        session, query, EROGATION_KEYS, page, limit, cursor, descending=True, ranking=ranking,
+        total_mode=total_mode
+    )
+
+    return EROGATION_PAGE.respond(items, page, limit, next_cursor, total, total_exact)
+
+@router.get("/erogations/export.csv")
+async def exportErogations(
+    filters: ErogationFilters = Depends(),
+    gzip: bool = Query(False, description="Compress the export, served as erogazioni.csv.gz"),
+):
+    query, _ = filters.apply(select(*EXPORT_COLUMNS))
+    query = query.order_by(*EROGATION_KEYS)
+    filename = "erogazioni.csv.gz" if gzip else "erogazioni.csv"
+    return StreamingResponse(
+        streamCsv(query, compress=gzip),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/erogations/export.{export_format}")
+async def exportErogationsColumnar(
+    export_format: ColumnarFormat,
+    filters: ErogationFilters = Depends(),
+):
+    pa = loadArrow()
+    query, _ = filters.apply(select(*EXPORT_COLUMNS))
+    query = query.order_by(*EROGATION_KEYS)
+    media_type, filename = COLUMNAR_MEDIA_TYPES[export_format]
+    return StreamingResponse(
+        streamColumnar(query, export_format, pa),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get(
+    "/erogations/summary",
+    response_model=List[rollups_schemas.ConsumptionSummary],
+)
+async def summarizeErogations(
+    bucket: RollupBucket = Query("month", description="Time bucket of the rollup, total for a single bucket"),
+    group_by: List[RollupGroup] = Query([], description="Dimensions to group by, repeatable"),
+    erogation_side: Optional[int] = Query(None),
+    dispensed_product: Optional[str] = Query(None),
+    company: Optional[str] = Query(None),
+    card: Optional[str] = Query(None),
+    vehicle_id: Optional[str] = Query(None),
+    start_day: Optional[date] = Query(None, description="First day included, e.g. 2025-01-01"),
+    end_day: Optional[date] = Query(None, description="Last day included, e.g. 2025-12-31"),
+    session: AsyncSession = Depends(get_session),
+):
     filters = {
+        "side": erogation_side,
+        "product": dispensed_product,
+        "company": company,
         "card": card,
         "vehicle_id": vehicle_id,
-        "company": company,
-        "erogation_side": erogation_side,
-        "mode": mode,
-        "dispensed_product": dispensed_product,
-        "vehicle_total_km": vehicle_total_km,
-        "dispensed_liters": dispensed_liters,
     }
-    for attr, val in filters.items():
-        if val is None:
-            continue
-        column = getattr(Erogation, attr)
-        if isinstance(val, (int, float)):
-            query = query.where(column == val)
-        else:
-            query = query.where(column.ilike(f"%{val}%"))
-
-    if start_time:
-        query = query.where(Erogation.erogation_timestamp >= start_time)
-    if end_time:
-        query = query.where(Erogation.erogation_timestamp <= end_time)
-
-    query = query.order_by(Erogation.erogation_timestamp.desc())
-    total = await session.scalar(select(func.count()).select_from(query.subquery()))
-    skip = (page - 1) * limit
-    stmt = query.offset(skip).limit(limit)
-    result = await session.execute(stmt)
-    items = result.scalars().all()
-
-    return Paginated(total=total, page=page, limit=limit, items=items)
+    return await rollups_crud.summarizeRollups(session, bucket, group_by, filters, start_day, end_day)
+
+@router.get(
+    "/erogations/efficiency",
+    response_model=List[efficiency_schemas.VehicleEfficiency],
+)
+async def vehicleEfficiency(
+    vehicle_id: Optional[str] = Query(None),
+    start_time: Optional[datetime] = Query(None, description="Start time in ISO-8601 format, e.g. 2025-04-26T10:50"),
+    end_time: Optional[datetime] = Query(None, description="End time in ISO-8601 format, e.g. 2025-04-26T10:52"),
+    ratio: float = Query(OUTLIER_RATIO, gt=1, description="Legs this many times above or below the vehicle median are outliers"),
+    session: AsyncSession = Depends(get_session),
+):
+    return await efficiency_crud.summarizeEfficiency(session, vehicle_id, start_time, end_time, ratio)
+
+@router.get(
+    "/erogations/efficiency/legs",
+    response_model=List[efficiency_schemas.EfficiencyLeg],
+)
+async def vehicleEfficiencyLegs(
+    vehicle_id: Optional[str] = Query(None),
+    start_time: Optional[datetime] = Query(None, description="Start time in ISO-8601 format, e.g. 2025-04-26T10:50"),
+    end_time: Optional[datetime] = Query(None, description="End time in ISO-8601 format, e.g. 2025-04-26T10:52"),
+    outliers_only: bool = Query(False),
+    ratio: float = Query(OUTLIER_RATIO, gt=1, description="Legs this many times above or below the vehicle median are outliers"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    return await efficiency_crud.listEfficiencyLegs(
+        session, vehicle_id, start_time, end_time, outliers_only, ratio, limit, (page - 1) * limit
+    )
+
+@router.get(
+    "/erogations/{erogation_id}/profile",
+    response_model=flow_profiles_schemas.FlowProfile,
+)
+async def getErogationProfile(
+    erogation_id: int,
+    session: AsyncSession = Depends(get_session),
+):
+    profile = await flow_profiles_crud.getFlowProfile(session, erogation_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Flow profile not found")
+    return profile
 
 @router.delete(
     "/erogations/",
@@ -323,6 +483,27 @@ async def deleteErogations(
         raise HTTPException(status_code=404, detail="No erogations found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@router.post(
+    "/erogations/purge",
+    response_model=retention_schemas.PurgeStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def purgeErogations(
+    before: datetime = Query(..., description="Erogations older than this ISO-8601 time are removed"),
+    archive: bool = Query(False, description="Write the purged rows to a gzip CSV under data/archive first"),
+    batch_size: int = Query(PURGE_BATCH_SIZE, ge=100, le=50000),
+):
+    if before.tzinfo is None:
+        before = before.replace(tzinfo=timezone.utc)
+    return purge_job.start(before, archive, batch_size)
+
+@router.get(
+    "/erogations/purge",
+    response_model=retention_schemas.PurgeStatus,
+)
+async def purgeProgress():
+    return purge_job.status
+
 @router.get("/parameters/", response_model=FullConfigSchema)
 def readParameters():
     return cfg_mgr.load_config()
@@ -334,9 +515,15 @@ def updateParameters(new_cfg: FullConfigSchema):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to save configuration"
         )
+    response_cache.bump("parameters")
     return cfg_mgr.current_config
 
 @router.post("/parameters/reset", status_code=status.HTTP_204_NO_CONTENT)
 def resetParameters():
     cfg_mgr.save_config(cfg_mgr.default_config)
+    response_cache.bump("parameters")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/cache/stats")
+def cacheStats():
+    return response_cache.stats()
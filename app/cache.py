@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict, defaultdict, namedtuple
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import engine
+from app.crud.notify import CHANGED_TABLES, DIRECTORY_CHANNEL
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+CACHE_MAX_ENTRIES = 256
+RETRY_DELAY = 5
+
+# path -> entities whose writes invalidate it
+CACHED_PATHS = {
+    "/drivers/": ("drivers",),
+    "/drivers/search/": ("drivers",),
+    "/vehicles/": ("vehicles",),
+    "/vehicles/search/": ("vehicles",),
+    "/erogations/": ("erogations",),
+    "/erogations/search/": ("erogations",),
+    "/parameters/": ("parameters",),
+}
+
+# headers a 304 repeats from the 200 it stands for
+NOT_MODIFIED_HEADERS = {"cache-control", "content-location", "date", "etag", "expires", "vary"}
+
+CacheEntry = namedtuple("CacheEntry", "generations etag body headers")
+
+
+def etagMatches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # If-None-Match uses the weak comparison, so W/ is ignored on both sides
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.generations = defaultdict(int)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def bump(self, entity: str = None):
+        if entity is None:
+            for name in {name for entities in CACHED_PATHS.values() for name in entities}:
+                self.generations[name] += 1
+        else:
+            self.generations[entity] += 1
+
+    def current(self, entities):
+        return tuple(self.generations[entity] for entity in entities)
+
+    def store(self, key, entry: CacheEntry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def respond(self, request: Request, entry: CacheEntry) -> Response:
+        if etagMatches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            response = Response(status_code=304)
+            headers = [(name, value) for name, value in entry.headers if name in NOT_MODIFIED_HEADERS]
+        else:
+            response = Response(content=entry.body)
+            headers = entry.headers
+        for name, value in headers:
+            response.headers.append(name, value)
+        return response
+
+    async def __call__(self, request: Request, call_next):
+        entities = CACHED_PATHS.get(request.url.path)
+        if request.method != "GET" or entities is None:
+            return await call_next(request)
+
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        generations = self.current(entities)
+        entry = self.entries.get(key)
+        if entry is not None and entry.generations == generations:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.respond(request, entry)
+
+        self.misses += 1
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        headers = [
+            (name, value) for name, value in response.headers.items()
+            if name not in ("content-length", "etag", "cache-control")
+        ] + [("etag", etag), ("cache-control", "no-cache")]
+        entry = CacheEntry(generations, etag, body, headers)
+        # a write that landed while the page was built leaves the entry stale on arrival
+        if self.current(entities) == generations:
+            self.store(key, entry)
+        return self.respond(request, entry)
+
+    def onNotify(self, connection, pid, channel, payload):
+        try:
+            self.bump(json.loads(payload)["table"])
+        except (ValueError, KeyError):
+            self.bump()
+
+    async def listen(self):
+        while True:
+            listener = None
+            try:
+                listener = await engine.connect()
+                raw = await listener.get_raw_connection()
+                lost = asyncio.Event()
+                await raw.driver_connection.add_listener(DIRECTORY_CHANNEL, self.onNotify)
+                raw.driver_connection.add_termination_listener(lambda connection: lost.set())
+                self.bump()
+                await lost.wait()
+                logging.warning("[WARNING]: response cache listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"[ERROR]: response cache listener failed, retrying in {RETRY_DELAY}s: {e}")
+            finally:
+                # invalidate so the pool drops the connection instead of reusing it with the listeners attached
+                if listener is not None:
+                    try:
+                        await listener.invalidate()
+                        await listener.close()
+                    except Exception as e:
+                        logging.error(f"[ERROR]: response cache listener not closed cleanly: {e}")
+            # writes may have been missed while disconnected
+            self.bump()
+            await asyncio.sleep(RETRY_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache()
+
+
+@event.listens_for(Session, "after_commit")
+def bumpCommitted(session):
+    for table in session.info.pop(CHANGED_TABLES, ()):
+        response_cache.bump(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def dropUncommitted(session):
+    session.info.pop(CHANGED_TABLES, None)
@@ -0,0 +1,84 @@
+from typing import get_args
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.models.drivers import Driver
+from app.models.vehicles import Vehicle
+from app.schemas.drivers import DriverCreate
+from app.schemas.vehicles import VehicleCreate
+from app.crud.notify import notifyChange
+
+# table -> (model, key column, id list field, unique columns besides the key, single-row schema)
+BATCH_TARGETS = {
+    "drivers": (Driver, Driver.card, "cards", [], DriverCreate),
+    "vehicles": (Vehicle, Vehicle.vehicle_id, "vehicle_ids", ["plate"], VehicleCreate),
+}
+
+def batchCriteria(table: str, where: dict):
+    model, key_column, ids_field, _, _ = BATCH_TARGETS[table]
+    criteria = []
+    keys = where.pop(ids_field, None)
+    if keys is not None:
+        criteria.append(key_column.in_(keys))
+    for field, value in where.items():
+        if value is not None:
+            criteria.append(getattr(model, field) == value)
+    if not criteria:
+        raise HTTPException(status_code=400, detail="Specificare almeno un filtro per l'operazione")
+    return criteria
+
+async def checkUnique(session: AsyncSession, table: str, criteria: list, values: dict):
+    model, key_column, _, uniques, _ = BATCH_TARGETS[table]
+    for column in uniques:
+        if values.get(column) is None:
+            continue
+        matched = await session.scalar(select(func.count()).select_from(model).where(*criteria))
+        if matched > 1:
+            raise HTTPException(status_code=409, detail=f"{column} deve essere unico: {matched} righe selezionate")
+        owner = await session.scalar(
+            select(key_column).where(
+                getattr(model, column) == values[column],
+                key_column.not_in(select(key_column).where(*criteria)),
+            ).limit(1)
+        )
+        if owner is not None:
+            raise HTTPException(status_code=409, detail=f"{column} {values[column]} già in uso da {owner}")
+
+def checkNulls(table: str, values: dict):
+    # an explicit null is only allowed where the single-row schema accepts one
+    schema = BATCH_TARGETS[table][4]
+    cleared = [
+        field for field, value in values.items()
+        if value is None and type(None) not in get_args(schema.model_fields[field].annotation)
+    ]
+    if cleared:
+        raise HTTPException(status_code=400, detail=f"Campi non annullabili: {', '.join(cleared)}")
+
+async def batchUpdate(session: AsyncSession, table: str, where: dict, values: dict) -> int:
+    model, key_column, _, _, _ = BATCH_TARGETS[table]
+    if not values:
+        raise HTTPException(status_code=400, detail="Nessun campo da aggiornare")
+    checkNulls(table, values)
+    criteria = batchCriteria(table, where)
+    await checkUnique(session, table, criteria, values)
+    result = await session.execute(
+        update(model).where(*criteria).values(**values).returning(key_column),
+        execution_options={"synchronize_session": False}
+    )
+    affected = len(result.scalars().all())
+    if affected:
+        await notifyChange(session, table, None)
+    await session.commit()
+    return affected
+
+async def batchDelete(session: AsyncSession, table: str, where: dict) -> int:
+    model, _, _, _, _ = BATCH_TARGETS[table]
+    criteria = batchCriteria(table, where)
+    result = await session.execute(
+        delete(model).where(*criteria),
+        execution_options={"synchronize_session": False}
+    )
+    if result.rowcount:
+        await notifyChange(session, table, None)
+    await session.commit()
+    return result.rowcount
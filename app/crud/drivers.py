@@ -2,6 +2,8 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from app.models.drivers import Driver
+from app.crud.notify import notifyChange
+from app.crud.search import textFilter
 
 """async def getAllDrivers(session: AsyncSession):
     result = await session.execute(select(Driver))
@@ -18,6 +20,7 @@ async def createDriver(session: AsyncSession, driver_data):
     
     new_driver = Driver(**driver_data.dict())
     session.add(new_driver)
+    await notifyChange(session, "drivers", new_driver.card)
     await session.commit()
     await session.refresh(new_driver)
     return new_driver
@@ -26,6 +29,7 @@ async def deleteDriverByCard(session: AsyncSession, card: str) -> bool:
     result = await session.execute(
         delete(Driver).where(Driver.card == card)
     )
+    await notifyChange(session, "drivers", card)
     await session.commit()
     return result.rowcount > 0
 
@@ -42,6 +46,9 @@ async def updateDriver(session: AsyncSession, card: str, driver_data):
     for key, value in driver_data.dict().items():
         setattr(driver, key, value)
     
+    await notifyChange(session, "drivers", card)
+    if driver_data.card != card:
+        await notifyChange(session, "drivers", driver_data.card)
     await session.commit()
     await session.refresh(driver)
     return driver
@@ -50,11 +57,11 @@ async def searchDrivers(session: AsyncSession, filters: dict):
     query = select(Driver)
     
     if filters.get('card'):
-        query = query.where(Driver.card.ilike(f"%{filters['card']}%"))
+        query = query.where(textFilter(Driver.card, filters['card']))
     if filters.get('company'):
-        query = query.where(Driver.company.ilike(f"%{filters['company']}%"))
+        query = query.where(textFilter(Driver.company, filters['company']))
     if filters.get('driver_full_name'):
-        query = query.where(Driver.driver_full_name.ilike(f"%{filters['driver_full_name']}%"))
+        query = query.where(textFilter(Driver.driver_full_name, filters['driver_full_name']))
     if filters.get('request_pin') is not None:
         query = query.where(Driver.request_pin == filters['request_pin'])
     if filters.get('request_vehicle_id') is not None:
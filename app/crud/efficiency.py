@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Numeric, case, cast, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.erogations import Erogation
+
+OUTLIER_RATIO = 1.5
+
+def efficiencyLegs(
+    vehicle_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    ratio: float = OUTLIER_RATIO,
+):
+    columns = (
+        Erogation.id,
+        Erogation.vehicle_id,
+        Erogation.erogation_timestamp,
+        Erogation.dispensed_liters,
+        Erogation.vehicle_total_km.label("km"),
+    )
+    valid = (Erogation.vehicle_id.isnot(None), Erogation.vehicle_total_km.isnot(None))
+    readings = select(*columns).where(*valid)
+    if vehicle_id is not None:
+        readings = readings.where(Erogation.vehicle_id == vehicle_id)
+    if end_time:
+        readings = readings.where(Erogation.erogation_timestamp <= end_time)
+    if start_time:
+        bounded = readings.where(Erogation.erogation_timestamp >= start_time)
+        # the first leg in the period needs the last reading before it, one index probe per vehicle
+        vehicles = bounded.with_only_columns(Erogation.vehicle_id).distinct().subquery("vehicles")
+        previous = select(*columns).where(
+            *valid,
+            Erogation.vehicle_id == vehicles.c.vehicle_id,
+            Erogation.erogation_timestamp < start_time,
+        ).order_by(Erogation.erogation_timestamp.desc(), Erogation.id.desc()).limit(1).lateral("previous")
+        readings = bounded.union_all(select(previous).select_from(vehicles.join(previous, true())))
+    readings = readings.subquery()
+
+    # each fill is charged to the distance driven since the previous fill of the same vehicle
+    window = {
+        "partition_by": readings.c.vehicle_id,
+        "order_by": (readings.c.erogation_timestamp, readings.c.id),
+    }
+    distance = readings.c.km - func.lag(readings.c.km).over(**window)
+    legs = select(
+        readings.c.id.label("erogation_id"),
+        readings.c.vehicle_id,
+        readings.c.erogation_timestamp,
+        func.lag(readings.c.erogation_timestamp).over(**window).label("previous_timestamp"),
+        distance.label("distance_km"),
+        readings.c.dispensed_liters.label("liters"),
+    ).cte("legs")
+
+    l100 = case(
+        (legs.c.distance_km > 0, legs.c.liters * 100 / legs.c.distance_km),
+        else_=None,
+    )
+    medians = select(
+        legs.c.vehicle_id,
+        func.percentile_cont(0.5).within_group(l100).label("median"),
+    ).where(legs.c.distance_km > 0).group_by(legs.c.vehicle_id).cte("medians")
+
+    status = case(
+        (legs.c.distance_km <= 0, "odometer"),
+        (l100 > medians.c.median * ratio, "high"),
+        (l100 * ratio < medians.c.median, "low"),
+        else_="ok",
+    )
+    return select(
+        legs.c.erogation_id,
+        legs.c.vehicle_id,
+        legs.c.erogation_timestamp,
+        legs.c.previous_timestamp,
+        legs.c.distance_km,
+        legs.c.liters,
+        func.round(l100, 2).label("l_per_100km"),
+        func.round(cast(medians.c.median, Numeric), 2).label("median_l_per_100km"),
+        status.label("status"),
+    ).select_from(
+        legs.outerjoin(medians, medians.c.vehicle_id == legs.c.vehicle_id)
+    ).where(legs.c.distance_km.isnot(None)).subquery()
+
+async def listEfficiencyLegs(
+    session: AsyncSession,
+    vehicle_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    outliers_only: bool = False,
+    ratio: float = OUTLIER_RATIO,
+    limit: int = 100,
+    offset: int = 0,
+):
+    legs = efficiencyLegs(vehicle_id, start_time, end_time, ratio)
+    query = select(legs)
+    if outliers_only:
+        query = query.where(legs.c.status != "ok")
+    query = query.order_by(legs.c.vehicle_id, legs.c.erogation_timestamp, legs.c.erogation_id)
+    result = await session.execute(query.offset(offset).limit(limit))
+    return [row._asdict() for row in result.all()]
+
+async def summarizeEfficiency(
+    session: AsyncSession,
+    vehicle_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    ratio: float = OUTLIER_RATIO,
+):
+    legs = efficiencyLegs(vehicle_id, start_time, end_time, ratio)
+    valid = legs.c.status != "odometer"
+    distance = func.sum(legs.c.distance_km).filter(valid)
+    liters = func.sum(legs.c.liters).filter(valid)
+    query = select(
+        legs.c.vehicle_id,
+        func.count().label("legs"),
+        distance.label("distance_km"),
+        liters.label("liters"),
+        func.round(liters * 100 / func.nullif(distance, 0), 2).label("l_per_100km"),
+        func.max(legs.c.median_l_per_100km).label("median_l_per_100km"),
+        func.count().filter(legs.c.status != "ok").label("outliers"),
+    ).group_by(legs.c.vehicle_id).order_by(legs.c.vehicle_id)
+    result = await session.execute(query)
+    return [row._asdict() for row in result.all()]
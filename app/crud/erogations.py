@@ -1,6 +1,10 @@
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.erogations import Erogation
+from app.crud.search import textFilter
+from app.crud.rollups import recordRollups
+from app.crud.notify import notifyChange
 
 """async def getErogations(session: AsyncSession):
     result = await session.execute(select(Erogation))
@@ -9,30 +13,43 @@ from app.models.erogations import Erogation
 async def createErogation(session: AsyncSession, erogation_data):
     new_erogation = Erogation(**erogation_data.dict())
     session.add(new_erogation)
+    await session.flush()
+    await recordRollups(session, [new_erogation.id], [new_erogation.erogation_timestamp])
+    await notifyChange(session, "erogations", None)
     await session.commit()
     await session.refresh(new_erogation)
     return new_erogation
 
+async def insertErogations(session: AsyncSession, rows: list):
+    stmt = pg_insert(Erogation).values(rows).on_conflict_do_nothing(
+        index_elements=[Erogation.idempotency_key, Erogation.erogation_timestamp]
+    ).returning(Erogation.id, Erogation.idempotency_key)
+    result = await session.execute(stmt)
+    return {key: erogation_id for erogation_id, key in result.all()}
+
 async def deleteErogations(session: AsyncSession):
-    result = await session.execute(delete(Erogation))
+    if await session.scalar(select(Erogation.id).limit(1)) is None:
+        return False
+    await session.execute(text("TRUNCATE erogations, erogation_profiles, erogation_rollups"))
+    await notifyChange(session, "erogations", None)
     await session.commit()
-    return result.rowcount > 0
+    return True
 
 async def searchErogations(session: AsyncSession, filters: dict):
     query = select(Erogation)
     
     if filters.get('card'):
-        query = query.where(Erogation.card.ilike(f"%{filters['card']}%"))
+        query = query.where(textFilter(Erogation.card, filters['card']))
     if filters.get('vehicle_id'):
-        query = query.where(Erogation.vehicle_id.ilike(f"%{filters['vehicle_id']}%"))
+        query = query.where(textFilter(Erogation.vehicle_id, filters['vehicle_id']))
     if filters.get('company'):
-        query = query.where(Erogation.company.ilike(f"%{filters['company']}%"))
+        query = query.where(textFilter(Erogation.company, filters['company']))
     if filters.get('erogation_side'):
         query = query.where(Erogation.erogation_side == filters['erogation_side'])
     if filters.get('mode'):
-        query = query.where(Erogation.mode.ilike(f"%{filters['mode']}%"))
+        query = query.where(textFilter(Erogation.mode, filters['mode']))
     if filters.get('dispensed_product'):
-        query = query.where(Erogation.dispensed_product.ilike(f"%{filters['dispensed_product']}%"))
+        query = query.where(textFilter(Erogation.dispensed_product, filters['dispensed_product']))
     if filters.get('vehicle_total_km'):
         query = query.where(Erogation.vehicle_total_km == filters['vehicle_total_km'])
     if filters.get('dispensed_liters') is not None:
@@ -0,0 +1,11 @@
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.flow_profiles import FlowProfile
+
+async def getFlowProfile(session: AsyncSession, erogation_id: int):
+    result = await session.execute(select(FlowProfile).filter(FlowProfile.erogation_id == erogation_id))
+    return result.scalars().first()
+
+async def insertFlowProfiles(session: AsyncSession, rows: list):
+    if rows:
+        await session.execute(insert(FlowProfile).values(rows))
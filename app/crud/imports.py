@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+from typing import Literal
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.drivers import Driver
+from app.models.vehicles import Vehicle
+from app.schemas.drivers import DriverCreate
+from app.schemas.vehicles import VehicleCreate
+from app.crud.notify import notifyChange
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# table -> (model, schema, conflict key, other unique columns)
+IMPORT_TARGETS = {
+    "drivers": (Driver, DriverCreate, "card", []),
+    "vehicles": (Vehicle, VehicleCreate, "vehicle_id", ["plate"]),
+}
+
+def parseRows(body: bytes, import_format: ImportFormat):
+    content = body.decode("utf-8-sig")
+    if import_format == "csv":
+        for number, row in enumerate(csv.DictReader(io.StringIO(content)), start=1):
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+    for number, line in enumerate(content.splitlines(), start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+def validationMessage(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+def stageRows(table: str, body: bytes, import_format: ImportFormat):
+    _, schema, key, uniques = IMPORT_TARGETS[table]
+    staged, errors, superseded = {}, {}, 0
+    owners = {column: {} for column in uniques}
+    for number, data in parseRows(body, import_format):
+        if isinstance(data, Exception):
+            errors[number] = {"row": number, "key": None, "error": f"invalid JSON: {data}"}
+            continue
+        try:
+            item = schema(**data).model_dump()
+        except (ValidationError, TypeError) as e:
+            message = validationMessage(e) if isinstance(e, ValidationError) else "row is not an object"
+            errors[number] = {"row": number, "key": None, "error": message}
+            continue
+
+        # the last valid occurrence of a key wins, earlier ones are counted as superseded
+        previous = staged.get(item[key])
+        replaced = previous[0] if previous else None
+        clash = next((column for column in uniques if owners[column].get(item[column], replaced) != replaced), None)
+        if clash:
+            errors[number] = {
+                "row": number, "key": item[key],
+                "error": f"{clash} {item[clash]} already used by row {owners[clash][item[clash]]}"
+            }
+            continue
+        if previous:
+            superseded += 1
+            for column in uniques:
+                owners[column].pop(previous[1][column], None)
+        for column in uniques:
+            owners[column][item[column]] = number
+        staged[item[key]] = (number, item)
+    return list(staged.values()), errors, superseded
+
+async def bulkUpsert(session: AsyncSession, table: str, body: bytes, import_format: ImportFormat):
+    model, _, key, uniques = IMPORT_TARGETS[table]
+    rows, errors, superseded = stageRows(table, body, import_format)
+    received = len(rows) + len(errors) + superseded
+    columns = [column.name for column in model.__table__.columns]
+    staging = f"import_{table}"
+
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await session.execute(text(
+        f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS, import_row integer) ON COMMIT DROP"
+    ))
+    await raw.driver_connection.copy_records_to_table(
+        staging,
+        records=[tuple(item[column] for column in columns) + (number,) for number, item in rows],
+        columns=columns + ["import_row"],
+    )
+
+    # rows that are staged themselves give up their values, so swaps inside one file are fine;
+    # dropping a row keeps its old values in the table, hence the loop
+    conflicts = True
+    while conflicts:
+        conflicts = False
+        for column in uniques:
+            result = await session.execute(text(
+                f"DELETE FROM {staging} s USING {table} t "
+                f"WHERE t.{column} = s.{column} AND t.{key} <> s.{key} "
+                f"AND t.{key} NOT IN (SELECT {key} FROM {staging}) "
+                f"RETURNING s.import_row, s.{key}, s.{column}, t.{key}"
+            ))
+            for number, row_key, value, owner in result.all():
+                conflicts = True
+                errors[number] = {"row": number, "key": row_key, "error": f"{column} {value} already used by {owner}"}
+
+    # unique checks run per row, so values that move between staged rows are parked first
+    for column in uniques:
+        await session.execute(text(
+            f"UPDATE {table} t SET {column} = '{staging}:' || t.{key} FROM {staging} s "
+            f"WHERE s.{key} = t.{key} AND s.{column} IS DISTINCT FROM t.{column}"
+        ))
+
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+    result = await session.execute(text(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(columns)} FROM {staging} ORDER BY import_row "
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates} "
+        f"RETURNING xmax = 0"
+    ))
+    outcomes = result.scalars().all()
+    inserted = sum(1 for created in outcomes if created)
+
+    if outcomes:
+        await notifyChange(session, table, None)
+    await session.commit()
+    return {
+        "received": received,
+        "inserted": inserted,
+        "updated": len(outcomes) - inserted,
+        "failed": len(errors),
+        "superseded": superseded,
+        "errors": sorted(errors.values(), key=lambda error: error["row"]),
+    }
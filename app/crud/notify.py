@@ -0,0 +1,15 @@
+import json
+from sqlalchemy import text
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DIRECTORY_CHANNEL = "pyfuel_directory"
+CHANGED_TABLES = "changed_tables"
+
+async def notifyChange(session: AsyncSession, table: str, key: Optional[str]):
+    session.info.setdefault(CHANGED_TABLES, set()).add(table)
+    payload = json.dumps({"table": table, "key": key})
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": DIRECTORY_CHANNEL, "payload": payload}
+    )
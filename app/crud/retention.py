@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.erogations import Erogation
+from app.models.flow_profiles import FlowProfile
+from app.crud.notify import notifyChange
+
+PARTITION_PREFIX = "erogations_y"
+DEFAULT_PARTITION = "erogations_default"
+PARTITIONS_AHEAD = 2
+PURGE_BATCH_SIZE = 5000
+
+def monthStart(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+def nextMonth(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+def partitionName(start: datetime) -> str:
+    return f"{PARTITION_PREFIX}{start.year:04d}m{start.month:02d}"
+
+def partitionStart(name: str) -> datetime:
+    year, month = name[len(PARTITION_PREFIX):].split("m")
+    return datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+
+async def isPartitioned(session: AsyncSession) -> bool:
+    relkind = await session.scalar(text("SELECT relkind FROM pg_class WHERE oid = 'erogations'::regclass"))
+    return relkind == "p"
+
+async def listPartitions(session: AsyncSession):
+    result = await session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'erogations'::regclass ORDER BY c.relname"
+    ))
+    partitions = []
+    for name in result.scalars().all():
+        if name.startswith(PARTITION_PREFIX):
+            start = partitionStart(name)
+            partitions.append((name, start, nextMonth(start)))
+    return partitions
+
+async def moveDefaultRows(session: AsyncSession, name: str, start: datetime, end: datetime) -> int:
+    # a new range can't be attached while the default partition holds rows inside it
+    bounds = {"start": start, "end": end}
+    where = "erogation_timestamp >= :start AND erogation_timestamp < :end"
+    if not await session.scalar(text(f"SELECT to_regclass('{DEFAULT_PARTITION}') IS NOT NULL")):
+        return 0
+    if not await session.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {where})"), bounds):
+        return 0
+    await session.execute(text(
+        f"CREATE TEMP TABLE moving_{name} ON COMMIT DROP AS SELECT * FROM {DEFAULT_PARTITION} WHERE {where}"
+    ), bounds)
+    result = await session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"), bounds)
+    return result.rowcount
+
+async def ensurePartitions(session: AsyncSession, ahead: int = PARTITIONS_AHEAD, since: datetime = None):
+    if not await isPartitioned(session):
+        return []
+    created = []
+    start = monthStart(since or datetime.now(timezone.utc))
+    for _ in range(ahead + 1):
+        end = nextMonth(start)
+        name = partitionName(start)
+        if not await session.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}):
+            moved = await moveDefaultRows(session, name, start, end)
+            await session.execute(text(
+                f"CREATE TABLE {name} PARTITION OF erogations "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            if moved:
+                await session.execute(text(f"INSERT INTO erogations SELECT * FROM moving_{name}"))
+            created.append((name, moved))
+        start = end
+    await session.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF erogations DEFAULT"))
+    await session.commit()
+    return created
+
+async def dropPartition(session: AsyncSession, name: str) -> int:
+    rows = await session.scalar(text(f"SELECT count(*) FROM {name}"))
+    await session.execute(text(f"DELETE FROM erogation_profiles WHERE erogation_id IN (SELECT id FROM {name})"))
+    await session.execute(text(f"ALTER TABLE erogations DETACH PARTITION {name}"))
+    await session.execute(text(f"DROP TABLE {name}"))
+    await notifyChange(session, "erogations", None)
+    await session.commit()
+    return rows
+
+async def purgeBatch(session: AsyncSession, cutoff: datetime, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    oldest = select(Erogation.id, Erogation.erogation_timestamp).where(
+        Erogation.erogation_timestamp < cutoff
+    ).order_by(Erogation.erogation_timestamp).limit(batch_size)
+    result = await session.execute(
+        delete(Erogation).where(
+            Erogation.erogation_timestamp < cutoff,
+            tuple_(Erogation.id, Erogation.erogation_timestamp).in_(oldest),
+        ).returning(Erogation.id)
+    )
+    erogation_ids = result.scalars().all()
+    if erogation_ids:
+        await session.execute(delete(FlowProfile).where(FlowProfile.erogation_id.in_(erogation_ids)))
+        await notifyChange(session, "erogations", None)
+    await session.commit()
+    return len(erogation_ids)
+
+async def countBefore(session: AsyncSession, cutoff: datetime) -> int:
+    return await session.scalar(
+        select(func.count()).select_from(Erogation).where(Erogation.erogation_timestamp < cutoff)
+    )
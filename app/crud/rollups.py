@@ -0,0 +1,109 @@
+import os
+from datetime import date
+from typing import Literal, Optional
+from sqlalchemy import Date, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.erogations import Erogation
+from app.models.rollups import ErogationRollup
+
+ROLLUP_TIMEZONE = os.getenv("ROLLUP_TZ", "UTC")
+ROLLUP_KEYS = ["day", "erogation_side", "dispensed_product", "company", "card", "vehicle_id"]
+ROLLUP_VALUES = ["dispenses", "liters", "amount"]
+
+RollupBucket = Literal["day", "week", "month", "year", "total"]
+RollupGroup = Literal["side", "product", "company", "card", "vehicle_id"]
+ROLLUP_GROUPS = {
+    "side": ErogationRollup.erogation_side,
+    "product": ErogationRollup.dispensed_product,
+    "company": ErogationRollup.company,
+    "card": ErogationRollup.card,
+    "vehicle_id": ErogationRollup.vehicle_id,
+}
+
+def rollupDay():
+    return cast(func.timezone(ROLLUP_TIMEZONE, Erogation.erogation_timestamp), Date)
+
+def aggregateErogations(*criteria):
+    keys = [
+        rollupDay(),
+        Erogation.erogation_side,
+        func.coalesce(Erogation.dispensed_product, ""),
+        func.coalesce(Erogation.company, ""),
+        func.coalesce(Erogation.card, ""),
+        func.coalesce(Erogation.vehicle_id, ""),
+    ]
+    return select(
+        *keys,
+        func.count(),
+        func.coalesce(func.sum(Erogation.dispensed_liters), 0),
+        func.coalesce(func.sum(Erogation.total_erogation_price), 0),
+    ).where(Erogation.erogation_timestamp.isnot(None), *criteria).group_by(*keys)
+
+def upsertRollups(query):
+    stmt = pg_insert(ErogationRollup).from_select(ROLLUP_KEYS + ROLLUP_VALUES, query)
+    return stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEYS,
+        set_={
+            name: getattr(ErogationRollup, name) + getattr(stmt.excluded, name)
+            for name in ROLLUP_VALUES
+        }
+    )
+
+async def recordRollups(session: AsyncSession, erogation_ids: list, timestamps: list) -> None:
+    if not erogation_ids:
+        return
+    # the timestamp bounds let the planner prune the monthly partitions
+    await session.execute(upsertRollups(aggregateErogations(
+        Erogation.id.in_(erogation_ids),
+        Erogation.erogation_timestamp.between(min(timestamps), max(timestamps)),
+    )))
+
+async def rebuildRollups(session: AsyncSession, start_day: Optional[date] = None, end_day: Optional[date] = None) -> int:
+    # blocks concurrent incremental updates until the rebuilt rows are committed
+    await session.execute(text(f"LOCK TABLE {ErogationRollup.__tablename__} IN EXCLUSIVE MODE"))
+    criteria, rollup_criteria = [], []
+    if start_day:
+        criteria.append(rollupDay() >= start_day)
+        rollup_criteria.append(ErogationRollup.day >= start_day)
+    if end_day:
+        criteria.append(rollupDay() <= end_day)
+        rollup_criteria.append(ErogationRollup.day <= end_day)
+    await session.execute(delete(ErogationRollup).where(*rollup_criteria))
+    result = await session.execute(upsertRollups(aggregateErogations(*criteria)))
+    await session.commit()
+    return result.rowcount
+
+async def summarizeRollups(
+    session: AsyncSession,
+    bucket: RollupBucket,
+    group_by: list,
+    filters: dict,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+):
+    keys = []
+    if bucket != "total":
+        keys.append(cast(func.date_trunc(bucket, ErogationRollup.day), Date).label("bucket"))
+    for group in dict.fromkeys(group_by):
+        column = ROLLUP_GROUPS[group]
+        keys.append(column if group == "side" else func.nullif(column, "").label(column.key))
+
+    query = select(
+        *keys,
+        func.sum(ErogationRollup.dispenses).label("dispenses"),
+        func.sum(ErogationRollup.liters).label("liters"),
+        func.sum(ErogationRollup.amount).label("amount"),
+    )
+    for group, value in filters.items():
+        if value is not None:
+            query = query.where(ROLLUP_GROUPS[group] == value)
+    if start_day:
+        query = query.where(ErogationRollup.day >= start_day)
+    if end_day:
+        query = query.where(ErogationRollup.day <= end_day)
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+
+    result = await session.execute(query)
+    return [row._asdict() for row in result.all() if row.dispenses]
@@ -0,0 +1,32 @@
+from sqlalchemy import func, or_
+
+def escapeLike(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def textFilter(column, value: str):
+    return column.ilike(f"%{escapeLike(value)}%", escape="\\")
+
+def applyFilters(query, model, filters: dict):
+    for attr, val in filters.items():
+        if val is None or val == "":
+            continue
+        column = getattr(model, attr)
+        if isinstance(val, str):
+            query = query.where(textFilter(column, val))
+        else:
+            query = query.where(column == val)
+    return query
+
+def rangeFilter(query, column, low=None, high=None):
+    if low is not None:
+        query = query.where(column >= low)
+    if high is not None:
+        query = query.where(column <= high)
+    return query
+
+def freeTextSearch(query, columns, text: str):
+    text = text.strip()
+    pattern = f"%{escapeLike(text)}%"
+    rank = func.greatest(*(func.coalesce(func.similarity(column, text), 0) for column in columns))
+    query = query.where(or_(*(column.ilike(pattern, escape="\\") for column in columns)))
+    return query, rank.desc()
@@ -1,7 +1,9 @@
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from app.models.vehicles import Vehicle
+from app.crud.notify import notifyChange
+from app.crud.search import textFilter
 
 """async def getAllVehicles(session: AsyncSession):
     result = await session.execute(select(Vehicle))
@@ -26,6 +28,7 @@ async def createVehicle(session: AsyncSession, vehicle_data):
     
     new_vehicle = Vehicle(**vehicle_data.dict())
     session.add(new_vehicle)
+    await notifyChange(session, "vehicles", new_vehicle.vehicle_id)
     await session.commit()
     await session.refresh(new_vehicle)
     return new_vehicle
@@ -34,6 +37,7 @@ async def deleteVehicleById(session: AsyncSession, vehicle_id: str) -> bool:
     result = await session.execute(
         delete(Vehicle).where(Vehicle.vehicle_id == vehicle_id)
     )
+    await notifyChange(session, "vehicles", vehicle_id)
     await session.commit()
     return result.rowcount > 0
 
@@ -55,21 +59,31 @@ async def updateVehicle(session: AsyncSession, vehicle_id: str, vehicle_data):
     for key, value in vehicle_data.dict().items():
         setattr(vehicle, key, value)
     
+    await notifyChange(session, "vehicles", vehicle_id)
+    if vehicle_data.vehicle_id != vehicle_id:
+        await notifyChange(session, "vehicles", vehicle_data.vehicle_id)
     await session.commit()
     await session.refresh(vehicle)
     return vehicle
+
+async def updateVehicleKm(session: AsyncSession, vehicle_id: str, vehicle_total_km: int):
+    await session.execute(
+        update(Vehicle).where(Vehicle.vehicle_id == vehicle_id).values(vehicle_total_km=vehicle_total_km)
+    )
+    await notifyChange(session, "vehicles", vehicle_id)
+    await session.commit()
     
 async def searchVehicles(session: AsyncSession, filters: dict):
     query = select(Vehicle)
     
     if filters.get('vehicle_id'):
-        query = query.where(Vehicle.vehicle_id.ilike(f"%{filters['vehicle_id']}%"))
+        query = query.where(textFilter(Vehicle.vehicle_id, filters['vehicle_id']))
     if filters.get('company_vehicle'):
-        query = query.where(Vehicle.company_vehicle.ilike(f"%{filters['company_vehicle']}%"))
+        query = query.where(textFilter(Vehicle.company_vehicle, filters['company_vehicle']))
     if filters.get('vehicle_total_km'):
         query = query.where(Vehicle.vehicle_total_km == filters['vehicle_total_km'])
     if filters.get('plate'):
-        query = query.where(Vehicle.plate.ilike(f"%{filters['plate']}%"))
+        query = query.where(textFilter(Vehicle.plate, filters['plate']))
     if filters.get('request_vehicle_km'):
         query = query.where(Vehicle.request_vehicle_km == filters['request_vehicle_km'])
     
@@ -1,16 +1,25 @@
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.database import engine, Base
+from app.database import engine, async_session, Base
+from app.cache import response_cache
+from app.crud.retention import ensurePartitions
 from app.api.routes import router as api_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as session:
+        await ensurePartitions(session)
+    listener = asyncio.create_task(response_cache.listen())
     yield
+    listener.cancel()
 
 app = FastAPI(
     title="pyfuel API",
@@ -24,6 +33,9 @@ app.mount(
     name="dashboard"
 )
 
+# registered before CORS so cached and 304 responses still pass through it
+app.middleware("http")(response_cache)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -3,3 +3,5 @@ from app.models.drivers import Driver
 from app.models.vehicles import Vehicle
 from app.models.erogations import Erogation
 from app.models.totals import DispenserTotals
+from app.models.flow_profiles import FlowProfile
+from app.models.rollups import ErogationRollup
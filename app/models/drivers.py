@@ -1,8 +1,13 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index
 from app.database import Base
 
 class Driver(Base):
     __tablename__ = "drivers"
+    __table_args__ = (
+        Index("ix_drivers_card_trgm", "card", postgresql_using="gin", postgresql_ops={"card": "gin_trgm_ops"}),
+        Index("ix_drivers_company_trgm", "company", postgresql_using="gin", postgresql_ops={"company": "gin_trgm_ops"}),
+        Index("ix_drivers_driver_full_name_trgm", "driver_full_name", postgresql_using="gin", postgresql_ops={"driver_full_name": "gin_trgm_ops"}),
+    )
     card = Column(String, primary_key=True, index=True)
     company = Column(String)
     driver_full_name = Column(String)
@@ -1,19 +1,34 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index, UniqueConstraint
 from app.database import Base
 from datetime import datetime, timezone
 
 class Erogation(Base):
     __tablename__ = "erogations"
+    __table_args__ = (
+        UniqueConstraint("idempotency_key", "erogation_timestamp", name="uq_erogations_idempotency_key"),
+        Index("ix_erogations_timestamp_id", "erogation_timestamp", "id"),
+        Index("ix_erogations_side_timestamp_id", "erogation_side", "erogation_timestamp", "id"),
+        Index("ix_erogations_vehicle_timestamp_id", "vehicle_id", "erogation_timestamp", "id"),
+        Index("ix_erogations_vehicle_total_km", "vehicle_total_km"),
+        Index("ix_erogations_dispensed_liters", "dispensed_liters"),
+        Index("ix_erogations_total_erogation_price", "total_erogation_price"),
+        Index("ix_erogations_card_trgm", "card", postgresql_using="gin", postgresql_ops={"card": "gin_trgm_ops"}),
+        Index("ix_erogations_company_trgm", "company", postgresql_using="gin", postgresql_ops={"company": "gin_trgm_ops"}),
+        Index("ix_erogations_driver_full_name_trgm", "driver_full_name", postgresql_using="gin", postgresql_ops={"driver_full_name": "gin_trgm_ops"}),
+        Index("ix_erogations_vehicle_id_trgm", "vehicle_id", postgresql_using="gin", postgresql_ops={"vehicle_id": "gin_trgm_ops"}),
+        {"postgresql_partition_by": "RANGE (erogation_timestamp)"},
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     card = Column(String, nullable=True)
     company = Column(String, nullable=True)
     driver_full_name = Column(String, nullable=True)
     vehicle_id = Column(String, nullable=True)
     company_vehicle = Column(String, nullable=True)
-    vehicle_total_km = Column(String, nullable=True)
+    vehicle_total_km = Column(Integer, nullable=True)
     erogation_side = Column(Integer, nullable=False)
-    dispensed_liters = Column(Float, nullable=True)
+    dispensed_liters = Column(Numeric(10, 2), nullable=True)
     dispensed_product = Column(String, nullable=True)
-    erogation_timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    erogation_timestamp = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc))
     mode = Column(String, nullable=False)
-    total_erogation_price = Column(Float, nullable=True)
+    total_erogation_price = Column(Numeric(10, 2), nullable=True)
+    idempotency_key = Column(String, nullable=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Float, JSON
+from app.database import Base
+
+class FlowProfile(Base):
+    __tablename__ = "erogation_profiles"
+    erogation_id = Column(Integer, primary_key=True)
+    start_lag_s = Column(Float, nullable=False)
+    duration_s = Column(Float, nullable=False)
+    min_flow_lpm = Column(Float, nullable=False)
+    avg_flow_lpm = Column(Float, nullable=False)
+    peak_flow_lpm = Column(Float, nullable=False)
+    bin_seconds = Column(Float, nullable=False)
+    curve = Column(JSON, nullable=False)
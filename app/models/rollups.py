@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Date, Numeric
+from app.database import Base
+
+class ErogationRollup(Base):
+    __tablename__ = "erogation_rollups"
+
+    day = Column(Date, primary_key=True)
+    erogation_side = Column(Integer, primary_key=True)
+    dispensed_product = Column(String, primary_key=True, default="")
+    company = Column(String, primary_key=True, default="")
+    card = Column(String, primary_key=True, default="")
+    vehicle_id = Column(String, primary_key=True, default="")
+    dispenses = Column(Integer, nullable=False, default=0)
+    liters = Column(Numeric(14, 3), nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
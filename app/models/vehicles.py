@@ -1,11 +1,16 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from app.database import Base
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        Index("ix_vehicles_vehicle_id_trgm", "vehicle_id", postgresql_using="gin", postgresql_ops={"vehicle_id": "gin_trgm_ops"}),
+        Index("ix_vehicles_plate_trgm", "plate", postgresql_using="gin", postgresql_ops={"plate": "gin_trgm_ops"}),
+        Index("ix_vehicles_vehicle_total_km", "vehicle_total_km"),
+    )
     vehicle_id = Column(String, primary_key=True)
     company_vehicle = Column(String)
     request_vehicle_km = Column(Boolean)
-    vehicle_total_km = Column(String)
+    vehicle_total_km = Column(Integer)
     plate = Column(String, unique=True, nullable=False)
 
@@ -0,0 +1,18 @@
+import argparse
+import asyncio
+from datetime import date
+from app.database import async_session, engine
+from app.crud.rollups import rebuildRollups
+
+async def main(start_day, end_day):
+    async with async_session() as session:
+        rows = await rebuildRollups(session, start_day, end_day)
+    await engine.dispose()
+    print(f"rebuilt {rows} rollup rows")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the erogation rollups from the erogations table")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day to rebuild, e.g. 2025-01-01")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day to rebuild, e.g. 2025-12-31")
+    args = parser.parse_args()
+    asyncio.run(main(args.start, args.end))
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class DriverBatchFilter(BaseModel):
+    cards: Optional[List[str]] = None
+    company: Optional[str] = None
+    request_pin: Optional[bool] = None
+    request_vehicle_id: Optional[bool] = None
+
+class DriverBatchChanges(BaseModel):
+    company: Optional[str] = None
+    driver_full_name: Optional[str] = None
+    request_pin: Optional[bool] = None
+    request_vehicle_id: Optional[bool] = None
+    pin: Optional[str] = None
+
+class DriverBatchUpdate(BaseModel):
+    where: DriverBatchFilter
+    values: DriverBatchChanges
+
+class VehicleBatchFilter(BaseModel):
+    vehicle_ids: Optional[List[str]] = None
+    company_vehicle: Optional[str] = None
+    request_vehicle_km: Optional[bool] = None
+
+class VehicleBatchChanges(BaseModel):
+    company_vehicle: Optional[str] = None
+    request_vehicle_km: Optional[bool] = None
+    vehicle_total_km: Optional[int] = None
+    plate: Optional[str] = None
+
+class VehicleBatchUpdate(BaseModel):
+    where: VehicleBatchFilter
+    values: VehicleBatchChanges
+
+class BatchResult(BaseModel):
+    affected: int
@@ -15,6 +15,10 @@ class FuelParametersSchema(BaseModel):
     timeout_reached_without_dispensing: int
     calibration_factor: float
     simulation_pulser: bool
+    pulse_counting_mode: Literal['callback', 'tally'] = 'callback'
+    acquisition_process: bool = False
+    relay_cutoff_latency: float = 0.2
+    daemon_cutoff: bool = False
 
 class GuiParametersSchema(BaseModel):
     side_exists: bool
@@ -52,6 +56,8 @@ class MainParametersSchema(BaseModel):
     vehicle_id_text: str
     km_prompt_text: str
     selection_time: int
+    directory_resync_interval: int = 300
+    record_flush_window: float = 0.5
 
 class FullConfigSchema(BaseModel):
     fuel_sides: Dict[Literal['side_1','side_2'], FuelParametersSchema]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+
+class EfficiencyLeg(BaseModel):
+    erogation_id: int
+    vehicle_id: str
+    erogation_timestamp: datetime
+    previous_timestamp: datetime
+    distance_km: float
+    liters: Optional[float] = None
+    l_per_100km: Optional[float] = None
+    median_l_per_100km: Optional[float] = None
+    status: Literal["ok", "high", "low", "odometer"]
+
+class VehicleEfficiency(BaseModel):
+    vehicle_id: str
+    legs: int
+    distance_km: Optional[float] = None
+    liters: Optional[float] = None
+    l_per_100km: Optional[float] = None
+    median_l_per_100km: Optional[float] = None
+    outliers: int
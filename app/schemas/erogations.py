@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PlainSerializer
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import Annotated, Optional
+
+Amount = Annotated[
+    Decimal,
+    Field(max_digits=10, decimal_places=2),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
 
 class ErogationBase(BaseModel):
     card: Optional[str] = None
@@ -8,13 +15,13 @@ class ErogationBase(BaseModel):
     driver_full_name: Optional[str] = None
     vehicle_id: Optional[str] = None
     company_vehicle: Optional[str] = None
-    vehicle_total_km: Optional[str] = None
+    vehicle_total_km: Optional[int] = None
     erogation_side: int
-    dispensed_liters: float
+    dispensed_liters: Amount
     dispensed_product: str
     erogation_timestamp: datetime
     mode: str
-    total_erogation_price: Optional[float] = None
+    total_erogation_price: Optional[Amount] = None
 
 class ErogationCreate(ErogationBase):
     pass
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+
+class FlowProfileBase(BaseModel):
+    start_lag_s: float
+    duration_s: float
+    min_flow_lpm: float
+    avg_flow_lpm: float
+    peak_flow_lpm: float
+    bin_seconds: float
+    curve: List[float]
+
+class FlowProfileCreate(FlowProfileBase):
+    pass
+
+class FlowProfile(FlowProfileBase):
+    erogation_id: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ImportRowError(BaseModel):
+    row: int
+    key: Optional[str] = None
+    error: str
+
+class ImportReport(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    failed: int
+    superseded: int
+    errors: List[ImportRowError]
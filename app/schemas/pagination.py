@@ -1,10 +1,12 @@
 from pydantic import BaseModel
-from typing import Generic, TypeVar, List
+from typing import Generic, TypeVar, List, Optional
 
 T = TypeVar("T")
 
 class Paginated(BaseModel, Generic[T]):
-    total: int
+    total: Optional[int] = None
+    total_exact: bool = True
     page: int
     limit: int
-    items: List[T]  
\ No newline at end of file
+    items: List[T]
+    next_cursor: Optional[str] = None  
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal, Optional
+
+class PurgeStatus(BaseModel):
+    state: Literal["idle", "archiving", "dropping", "deleting", "done", "failed"] = "idle"
+    cutoff: Optional[datetime] = None
+    archive_path: Optional[str] = None
+    rows_total: int = 0
+    rows_deleted: int = 0
+    batches: int = 0
+    partitions_dropped: List[str] = []
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+class ConsumptionSummary(BaseModel):
+    bucket: Optional[date] = None
+    erogation_side: Optional[int] = None
+    dispensed_product: Optional[str] = None
+    company: Optional[str] = None
+    card: Optional[str] = None
+    vehicle_id: Optional[str] = None
+    dispenses: int
+    liters: float
+    amount: float
@@ -4,7 +4,7 @@ class VehicleBase(BaseModel):
     vehicle_id: str
     company_vehicle: str
     request_vehicle_km: bool
-    vehicle_total_km: str
+    vehicle_total_km: int = 0
     plate: str
 
 class VehicleCreate(VehicleBase):
@@ -0,0 +1,84 @@
+# Usage, from anywhere: python benchmarks/page_serialization.py [--limit 100] [--repeat 500]
+# app.database needs DB_URL to build its engine. No connection is opened, so a placeholder is used when it is unset.
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DB_URL", "postgresql+asyncpg://localhost/pyfuel")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.api.pagination import PageEncoder
+from app.models.erogations import Erogation
+from app.schemas import erogations as erogations_schemas
+from app.schemas.pagination import Paginated
+
+def erogationRows(count: int):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "card": f"{i:08d}",
+            "company": "pyfuel srl",
+            "driver_full_name": f"Driver {i}",
+            "vehicle_id": f"V{i % 40:03d}",
+            "company_vehicle": "pyfuel srl",
+            "vehicle_total_km": 120000 + i * 37,
+            "erogation_side": i % 2 + 1,
+            "dispensed_liters": Decimal("42.17") + i,
+            "dispensed_product": "diesel",
+            "erogation_timestamp": start + timedelta(minutes=i),
+            "mode": "operator",
+            "total_erogation_price": Decimal("71.25") + i,
+        }
+        for i in range(count)
+    ]
+
+async def ormPage(field, objects, limit: int) -> bytes:
+    content = Paginated(total=len(objects), total_exact=True, page=1, limit=limit, items=objects)
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+def tuplePage(encoder, rows, limit: int) -> bytes:
+    return encoder.encode(rows, 1, limit, total=len(rows))
+
+async def timed(run, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await run()
+    return (time.perf_counter() - start) / repeat
+
+async def main(limit: int, repeat: int):
+    data = erogationRows(limit)
+    objects = [Erogation(**row) for row in data]
+    encoder = PageEncoder(erogations_schemas.Erogation, Erogation, [Erogation.erogation_timestamp, Erogation.id])
+    rows = [tuple(row[column.key] for column in encoder.columns) for row in data]
+    field = create_model_field(
+        name="Response_listErogations", type_=Paginated[erogations_schemas.Erogation], mode="serialization"
+    )
+
+    if await ormPage(field, objects, limit) != tuplePage(encoder, rows, limit):
+        raise SystemExit("the two paths produced different JSON")
+
+    async def fast():
+        tuplePage(encoder, rows, limit)
+
+    orm = await timed(lambda: ormPage(field, objects, limit), repeat)
+    columns = await timed(fast, repeat)
+    print(f"{limit} rows per page, {repeat} pages")
+    print(f"orm objects + response_model: {orm * 1000:.3f} ms/page")
+    print(f"column tuples + PageEncoder: {columns * 1000:.3f} ms/page")
+    print(f"speedup: {orm / columns:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the ORM and column tuple serialization of an erogations page")
+    parser.add_argument("--limit", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=500, help="pages to serialize per path")
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.repeat))
@@ -16,6 +16,10 @@ class FuelParameters:
     timeout_reached_without_dispensing: int = 60
     calibration_factor: float = 1
     simulation_pulser: bool = False
+    pulse_counting_mode: str = "callback"
+    acquisition_process: bool = False
+    relay_cutoff_latency: float = 0.2
+    daemon_cutoff: bool = False
 
 @dataclass
 class GuiParameters:
@@ -53,6 +57,8 @@ class MainParameters:
     vehicle_id_text: str = "INSERIRE ID VEICOLO:"
     km_prompt_text: str = "INSERIRE KM:"
     selection_time: int = 20
+    directory_resync_interval: int = 300
+    record_flush_window: float = 0.5
 
 @dataclass
 class FuelSides:
@@ -12,17 +12,20 @@ export class Dashboard {
         dispenses: {
             currentPage: 1,
             pageSize: 25,
-            totalItems: 0
+            totalItems: 0,
+            cursors: {}
         },
         vehicles: {
             currentPage: 1,
             pageSize: 25,
-            totalItems: 0
+            totalItems: 0,
+            cursors: {}
         },
         drivers: {
             currentPage: 1,
             pageSize: 25,
-            totalItems: 0
+            totalItems: 0,
+            cursors: {}
         }
     };
 
@@ -36,20 +39,31 @@ export class Dashboard {
             'mode',
             'dispensed_product',
             'dispensed_liters',
+            'km_min',
+            'km_max',
+            'liters_min',
+            'liters_max',
+            'price_min',
+            'price_max',
+            'q',
         ],
         vehicles: [
             'vehicle_id',
             'company_vehicle',
             'vehicle_total_km',
+            'km_min',
+            'km_max',
             'plate',
-            'request_vehicle_km'
+            'request_vehicle_km',
+            'q'
         ],
         drivers: [
             'card',
             'company',
             'driver_full_name',
             'request_pin',
-            'request_vehicle_id'
+            'request_vehicle_id',
+            'q'
         ]
     };
 
@@ -114,18 +128,21 @@ export class Dashboard {
         document.getElementById('dispenses-page-size')?.addEventListener('change', (e) => {
             this.pagination.dispenses.pageSize = parseInt(e.target.value);
             this.pagination.dispenses.currentPage = 1;
+            this.pagination.dispenses.cursors = {};
             DispensesModule.loadDispenses();
         });
 
         document.getElementById('vehicles-page-size')?.addEventListener('change', (e) => {
             this.pagination.vehicles.pageSize = parseInt(e.target.value);
             this.pagination.vehicles.currentPage = 1;
+            this.pagination.vehicles.cursors = {};
             VehiclesModule.loadVehicles();
         });
 
         document.getElementById('drivers-page-size')?.addEventListener('change', (e) => {
             this.pagination.drivers.pageSize = parseInt(e.target.value);
             this.pagination.drivers.currentPage = 1;
+            this.pagination.drivers.cursors = {};
             DriversModule.loadDrivers();
         });
     }
@@ -18,8 +18,8 @@ export class DispensesModule {
             loading.classList.remove('d-none');
 
             const urlParams = new URLSearchParams({
-                page: currentPage,
-                limit: pageSize,
+                ...Pagination.pageParams('dispenses'),
+                total_mode: 'estimate',
                 ...filters
             });
 
@@ -27,6 +27,8 @@ export class DispensesModule {
             const data = await ApiService.fetchWithRetry(url);
 
             Dashboard.pagination.dispenses.totalItems = data.total;
+            Dashboard.pagination.dispenses.totalExact = data.total_exact;
+            Pagination.rememberCursor('dispenses', currentPage, data.next_cursor);
             TableRenderer.renderDispenses(data.items);
             Pagination.updatePaginationControls('dispenses');
 
@@ -79,6 +81,7 @@ export class DispensesModule {
             const data = await ApiService.fetchWithRetry(url);
 
             Dashboard.pagination.dispenses.totalItems = data.total;
+            Dashboard.pagination.dispenses.totalExact = data.total_exact;
             TableRenderer.renderDispenses(data.items);
             Pagination.updatePaginationControls('dispenses');
 
@@ -118,10 +121,24 @@ export class DispensesModule {
 
     static async exportAllDispenses() {
         try {
-            const url = `${Dashboard.API_BASE}/erogations/`;
-            const data = await ApiService.fetchWithRetry(url);
-            Dashboard.exportDataToCSV(data.items, 'erogazioni_complete.csv');
-            Toast.showToast('Tutte le erogazioni esportate con successo');
+            const startTime = document.getElementById('dispenses-start-filter')._flatpickr.selectedDates[0]?.toISOString();
+            const endTime = document.getElementById('dispenses-end-filter')._flatpickr.selectedDates[0]?.toISOString();
+            const query = document.getElementById('dispenses-search').value.trim();
+
+            const exportParams = { gzip: 'true' };
+            if (startTime) exportParams.start_time = startTime;
+            if (endTime) exportParams.end_time = endTime;
+            if (query) {
+                const parsedQuery = Dashboard.parseSearchQuery(query);
+                Dashboard.validateSearchParams('dispenses', parsedQuery);
+                Object.assign(exportParams, parsedQuery);
+            }
+
+            const link = document.createElement('a');
+            link.href = `${Dashboard.API_BASE}/erogations/export.csv?${new URLSearchParams(exportParams).toString()}`;
+            link.download = 'erogazioni.csv.gz';
+            link.click();
+            Toast.showToast('Esportazione erogazioni avviata');
         } catch (err) {
             console.error('Errore esportazione erogazioni:', err);
             Toast.showToast(`Errore durante l'esportazione: ${err.message}`, 'danger');
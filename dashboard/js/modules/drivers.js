@@ -18,10 +18,11 @@ export class DriversModule {
             btn.disabled = true;
             loading.classList.remove('d-none');
 
-            const url = `${Dashboard.API_BASE}/drivers/?page=${currentPage}&limit=${pageSize}`;
+            const url = `${Dashboard.API_BASE}/drivers/?${new URLSearchParams(Pagination.pageParams('drivers')).toString()}`;
             const data = await ApiService.fetchWithRetry(url);
 
             Dashboard.pagination.drivers.totalItems = data.total || data.items.length;
+            Pagination.rememberCursor('drivers', currentPage, data.next_cursor);
             Dashboard.driversCache = data.items;
             TableRenderer.renderDrivers(data.items);
             Pagination.updatePaginationControls('drivers');
@@ -62,7 +62,11 @@ export class ParametersModule {
                         reverse_nozzle_polarity: false,
                         timeout_reached_without_dispensing: 0,
                         calibration_factor: 1.0,
-                        simulation_pulser: false
+                        simulation_pulser: false,
+                        pulse_counting_mode: 'callback',
+                        acquisition_process: false,
+                        relay_cutoff_latency: 0.2,
+                        daemon_cutoff: false
                     };
                     container.innerHTML = `
                     <div class="mb-3 form-check form-switch">
@@ -156,7 +160,11 @@ export class ParametersModule {
                     reverse_nozzle_polarity: side.reverse_nozzle_polarity || false,
                     timeout_reached_without_dispensing: side.timeout_reached_without_dispensing || 0,
                     calibration_factor: side.calibration_factor || 1.0,
-                    simulation_pulser: side.simulation_pulser || false
+                    simulation_pulser: side.simulation_pulser || false,
+                    pulse_counting_mode: side.pulse_counting_mode || 'callback',
+                    acquisition_process: side.acquisition_process || false,
+                    relay_cutoff_latency: side.relay_cutoff_latency || 0.2,
+                    daemon_cutoff: side.daemon_cutoff || false
                 };
 
                 html += this.getFuelSideParametersHtml(i, sideParams);
@@ -232,6 +240,32 @@ export class ParametersModule {
                 Simulatore contatore impulsi
             </label>
         </div>
+        <div class="mb-3">
+            <label for="fuel-${side}-pulse_counting_mode" class="form-label">Modalità conteggio impulsi</label>
+            <select class="form-select" id="fuel-${side}-pulse_counting_mode">
+                <option value="callback" ${params.pulse_counting_mode === 'callback' ? 'selected' : ''}>Callback per impulso</option>
+                <option value="tally" ${params.pulse_counting_mode === 'tally' ? 'selected' : ''}>Conteggio nel demone (tally)</option>
+            </select>
+        </div>
+        <div class="mb-3 form-check">
+            <input class="form-check-input" type="checkbox" id="fuel-${side}-acquisition_process"
+                ${params.acquisition_process ? 'checked' : ''}>
+            <label class="form-check-label" for="fuel-${side}-acquisition_process">
+                Acquisizione impulsi in processo dedicato
+            </label>
+        </div>
+        <div class="mb-3">
+            <label for="fuel-${side}-relay_cutoff_latency" class="form-label">Latenza iniziale chiusura relè/valvola (s)</label>
+            <input type="number" step="0.01" class="form-control" id="fuel-${side}-relay_cutoff_latency"
+                value="${params.relay_cutoff_latency}">
+        </div>
+        <div class="mb-3 form-check">
+            <input class="form-check-input" type="checkbox" id="fuel-${side}-daemon_cutoff"
+                ${params.daemon_cutoff ? 'checked' : ''}>
+            <label class="form-check-label" for="fuel-${side}-daemon_cutoff">
+                Chiusura preset nel demone pigpio
+            </label>
+        </div>
     `;
     }
 
@@ -446,6 +480,16 @@ export class ParametersModule {
             <input type="number" class="form-control" id="main-selection_time"
                 value="${params.selection_time || ''}">
         </div>
+        <div class="mb-3">
+            <label for="main-directory_resync_interval" class="form-label">Risincronizzazione autisti/veicoli (s)</label>
+            <input type="number" class="form-control" id="main-directory_resync_interval"
+                value="${params.directory_resync_interval || 300}">
+        </div>
+        <div class="mb-3">
+            <label for="main-record_flush_window" class="form-label">Finestra scrittura erogazioni (s)</label>
+            <input type="number" step="0.1" class="form-control" id="main-record_flush_window"
+                value="${params.record_flush_window || 0.5}">
+        </div>
         `;
     }
 
@@ -473,7 +517,11 @@ export class ParametersModule {
                     reverse_nozzle_polarity: Utilities.safeGetChecked(`${p}reverse_nozzle_polarity`),
                     timeout_reached_without_dispensing: parseInt(Utilities.safeGetValue(`${p}timeout_reached_without_dispensing`, 0), 10),
                     calibration_factor: parseFloat(Utilities.safeGetValue(`${p}calibration_factor`, 1)),
-                    simulation_pulser: Utilities.safeGetChecked(`${p}simulation_pulser`)
+                    simulation_pulser: Utilities.safeGetChecked(`${p}simulation_pulser`),
+                    pulse_counting_mode: Utilities.safeGetValue(`${p}pulse_counting_mode`, 'callback'),
+                    acquisition_process: Utilities.safeGetChecked(`${p}acquisition_process`),
+                    relay_cutoff_latency: parseFloat(Utilities.safeGetValue(`${p}relay_cutoff_latency`, 0.2)),
+                    daemon_cutoff: Utilities.safeGetChecked(`${p}daemon_cutoff`)
                 };
             }
 
@@ -514,7 +562,9 @@ export class ParametersModule {
                 pin_keyboard_text: Utilities.safeGetValue('main-pin_keyboard_text', ''),
                 vehicle_id_text: Utilities.safeGetValue('main-vehicle_id_text', ''),
                 km_prompt_text: Utilities.safeGetValue('main-km_prompt_text', ''),
-                selection_time: parseInt(Utilities.safeGetValue('main-selection_time', 0), 10)
+                selection_time: parseInt(Utilities.safeGetValue('main-selection_time', 0), 10),
+                directory_resync_interval: parseInt(Utilities.safeGetValue('main-directory_resync_interval', 300), 10),
+                record_flush_window: parseFloat(Utilities.safeGetValue('main-record_flush_window', 0.5))
             };
 
             const url = `${Dashboard.API_BASE}/parameters/`;
@@ -18,10 +18,11 @@ export class VehiclesModule {
             btn.disabled = true;
             loading.classList.remove('d-none');
 
-            const url = `${Dashboard.API_BASE}/vehicles/?page=${currentPage}&limit=${pageSize}`;
+            const url = `${Dashboard.API_BASE}/vehicles/?${new URLSearchParams(Pagination.pageParams('vehicles')).toString()}`;
             const data = await ApiService.fetchWithRetry(url);
 
             Dashboard.pagination.vehicles.totalItems = data.total || data.items.length;
+            Pagination.rememberCursor('vehicles', currentPage, data.next_cursor);
             Dashboard.vehiclesCache = data.items;
             TableRenderer.renderVehicles(data.items);
             Pagination.updatePaginationControls('vehicles');
@@ -111,7 +112,7 @@ export class VehiclesModule {
             const payload = {
                 vehicle_id: form.id_veicolo.value,
                 company_vehicle: form.nome_compagnia.value,
-                vehicle_total_km: String(form.km_totali_veicolo.value || '0'),
+                vehicle_total_km: parseInt(form.km_totali_veicolo.value, 10) || 0,
                 plate: form.targa.value,
                 request_vehicle_km: form.richiedi_km_veicolo.checked
             };
@@ -1,24 +1,53 @@
 export class Pagination {
+    static moduleMap = {
+        dispenses: 'DispensesModule',
+        vehicles: 'VehiclesModule',
+        drivers: 'DriversModule'
+    };
+
+    static loaderCall(section, page) {
+        return `${this.moduleMap[section]}.load${section.charAt(0).toUpperCase() + section.slice(1)}(${page})`;
+    }
+
+    static pageParams(section) {
+        const { currentPage, pageSize, cursors = {} } = Dashboard.pagination[section];
+        const params = { page: currentPage, limit: pageSize };
+        if (cursors[currentPage]) {
+            params.cursor = cursors[currentPage];
+        }
+        return params;
+    }
+
+    static rememberCursor(section, page, nextCursor) {
+        const state = Dashboard.pagination[section];
+        state.cursors = state.cursors || {};
+        if (nextCursor) {
+            state.cursors[page + 1] = nextCursor;
+        } else {
+            delete state.cursors[page + 1];
+        }
+    }
+
     static updatePaginationControls(section) {
-        const { currentPage, pageSize, totalItems } = Dashboard.pagination[section];
+        const { currentPage, pageSize, totalItems, totalExact = true } = Dashboard.pagination[section];
         const totalPages = Math.ceil(totalItems / pageSize);
         const controlsContainer = document.querySelector(`#${section} .pagination-controls`);
 
         controlsContainer.innerHTML = `
         <div class="btn-group">
             <button class="btn btn-sm btn-outline-primary ${currentPage <= 1 ? 'disabled' : ''}" 
-                onclick="DispensesModule.loadDispenses(${currentPage - 1})">
+                onclick="${this.loaderCall(section, currentPage - 1)}">
                 <i class="bi bi-chevron-left"></i>
             </button>
             
             ${this.generatePageNumbers(section, currentPage, totalPages)}
             
             <button class="btn btn-sm btn-outline-primary ${currentPage >= totalPages ? 'disabled' : ''}" 
-                onclick="DispensesModule.loadDispenses(${currentPage + 1})">
+                onclick="${this.loaderCall(section, currentPage + 1)}">
                 <i class="bi bi-chevron-right"></i>
             </button>
         </div>
-        <span class="ms-2">Pagina ${currentPage} di ${totalPages}</span>
+        <span class="ms-2">Pagina ${currentPage} di ${totalExact ? '' : '~'}${totalPages}</span>
     `;
     }
 
@@ -58,16 +87,9 @@ export class Pagination {
     }
 
     static getPageButton(section, page, currentPage) {
-        const moduleMap = {
-            dispenses: 'DispensesModule',
-            vehicles: 'VehiclesModule',
-            drivers: 'DriversModule'
-        };
-        const module = moduleMap[section];
-
         return `
             <button class="btn btn-sm ${page === currentPage ? 'btn-primary' : 'btn-outline-primary'}" 
-                onclick="${module}.load${section.charAt(0).toUpperCase() + section.slice(1)}(${page})">
+                onclick="${this.loaderCall(section, page)}">
                 ${page}
             </button>
         `;
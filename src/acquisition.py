@@ -0,0 +1,264 @@
+import logging
+import multiprocessing
+import struct
+import threading
+from multiprocessing import shared_memory
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# status, relay level, generation, pulses, first tick, last tick
+HEADER = struct.Struct("<BBxxIQII")
+TICK_RING_SIZE = 256
+TICK = struct.Struct("<I")
+SEGMENT_SIZE = HEADER.size + TICK_RING_SIZE * TICK.size
+LOCK_TIMEOUT = 0.02
+MAX_LOCK_TIMEOUTS = 3
+
+STATUS_STARTING = 0
+STATUS_READY = 1
+STATUS_FAILED = 2
+
+
+class SharedCounter:
+    # the segment is guarded by a process-shared semaphore rather than a sequence counter: taking and
+    # releasing it are full barriers, so the reader sees the payload stores in order on the Pi's weakly
+    # ordered ARM cores, and a reader never spins on a writer that died mid-update
+    def __init__(self, shm: shared_memory.SharedMemory, lock):
+        self.shm = shm
+        self.buf = shm.buf
+        self.lock = lock
+
+    def write(self, status, relay, generation, pulses, first_tick, last_tick, new_tick=None):
+        with self.lock:
+            if new_tick is not None:
+                TICK.pack_into(self.buf, HEADER.size + (pulses % TICK_RING_SIZE) * TICK.size, new_tick)
+            HEADER.pack_into(self.buf, 0, status, relay, generation, pulses, first_tick, last_tick)
+
+    def read(self):
+        if not self.lock.acquire(timeout=LOCK_TIMEOUT):
+            return None
+        try:
+            return HEADER.unpack_from(self.buf, 0)
+        finally:
+            self.lock.release()
+
+    def readTicks(self, since: int):
+        if not self.lock.acquire(timeout=LOCK_TIMEOUT):
+            return None
+        try:
+            header = HEADER.unpack_from(self.buf, 0)
+            pulses = header[3]
+            # pulse n is stored at n % TICK_RING_SIZE, older ones have been overwritten
+            first = max(since + 1, pulses - TICK_RING_SIZE + 1)
+            ticks = [
+                TICK.unpack_from(self.buf, HEADER.size + (n % TICK_RING_SIZE) * TICK.size)[0]
+                for n in range(first, pulses + 1)
+            ]
+            return header, ticks
+        finally:
+            self.lock.release()
+
+
+class AcquisitionWorker:
+    def __init__(self, params, side_number, shm_name, shm_lock, conn):
+        self.params = params
+        self.side_number = side_number
+        self.conn = conn
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.counter = SharedCounter(self.shm, shm_lock)
+        self.lock = threading.Lock()
+        self.status = STATUS_STARTING
+        self.relay = 0
+        self.generation = 0
+        self.pulses = 0
+        self.first_tick = 0
+        self.last_tick = 0
+        self.counting = False
+        self.preset_threshold = 0
+        self.pi = None
+
+    def publish(self, new_tick=None):
+        self.counter.write(
+            self.status, self.relay, self.generation, self.pulses, self.first_tick, self.last_tick, new_tick
+        )
+
+    def setupGpio(self):
+        import pigpio
+
+        self.pi = pigpio.pi()
+        if not self.pi.connected:
+            raise RuntimeError("pigpiod not reachable")
+        self.pi.set_mode(self.params.relay_pin, pigpio.OUTPUT)
+        self.pi.write(self.params.relay_pin, 0)
+        self.pi.set_mode(self.params.pulser_pin, pigpio.INPUT)
+        self.pi.set_pull_up_down(self.params.pulser_pin, pigpio.PUD_UP)
+        self.pi.callback(self.params.pulser_pin, pigpio.FALLING_EDGE, self.updateCounter)
+
+    def updateCounter(self, gpio, level, tick):
+        with self.lock:
+            if not self.counting:
+                return
+            self.pulses += 1
+            if self.pulses == 1:
+                self.first_tick = tick
+            self.last_tick = tick
+            if self.preset_threshold and self.relay and self.pulses >= self.preset_threshold:
+                self.writeRelay(0)
+            self.publish(tick)
+
+    def writeRelay(self, level):
+        self.relay = level
+        if self.pi:
+            self.pi.write(self.params.relay_pin, level)
+
+    def handleCommand(self, command, *args):
+        with self.lock:
+            if command == "relay":
+                self.writeRelay(args[0])
+            elif command == "start":
+                self.generation = args[0]
+                self.pulses = 0
+                self.first_tick = self.last_tick = 0
+                self.counting = True
+            elif command == "stop":
+                self.counting = False
+                self.preset_threshold = 0
+                self.writeRelay(0)
+            elif command == "preset":
+                self.preset_threshold = args[0]
+            self.publish()
+
+    def run(self):
+        try:
+            self.setupGpio()
+            self.status = STATUS_READY
+            logging.info(f"[INFO]: acquisition worker ready for side {self.side_number}")
+        except Exception as e:
+            self.status = STATUS_FAILED
+            logging.error(f"[ERROR]: acquisition worker failed to configure gpio for side {self.side_number}: {e}")
+        self.publish()
+
+        try:
+            while True:
+                command, *args = self.conn.recv()
+                if command == "close":
+                    break
+                self.handleCommand(command, *args)
+        except (EOFError, KeyboardInterrupt):
+            pass
+        finally:
+            with self.lock:
+                self.counting = False
+                self.writeRelay(0)
+            if self.pi:
+                self.pi.stop()
+            self.shm.close()
+            logging.info(f"[INFO]: acquisition worker stopped for side {self.side_number}")
+
+
+def runAcquisitionWorker(params, side_number, shm_name, shm_lock, conn):
+    AcquisitionWorker(params, side_number, shm_name, shm_lock, conn).run()
+
+
+class AcquisitionClient:
+    def __init__(self, params, side_number):
+        self.side_number = side_number
+        self.shm = shared_memory.SharedMemory(create=True, size=SEGMENT_SIZE)
+        self.shm.buf[:SEGMENT_SIZE] = bytes(SEGMENT_SIZE)
+        ctx = multiprocessing.get_context("spawn")
+        shm_lock = ctx.Lock()
+        self.counter = SharedCounter(self.shm, shm_lock)
+        self.generation = 0
+        self.header = HEADER.unpack_from(self.shm.buf, 0)
+        self.lock_timeouts = 0
+        self.failed = False
+
+        self.conn, worker_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=runAcquisitionWorker,
+            args=(params, side_number, self.shm.name, shm_lock, worker_conn),
+            name=f"pyfuel-acquisition-{side_number}",
+            daemon=True
+        )
+        self.process.start()
+        worker_conn.close()
+        self.closed = False
+        logging.info(f"[INFO]: acquisition worker started for side {side_number} (pid {self.process.pid})")
+
+    def send(self, *command):
+        try:
+            self.conn.send(command)
+        except (BrokenPipeError, OSError) as e:
+            logging.error(f"[ERROR]: acquisition worker unreachable for side {self.side_number}: {e}")
+
+    def fail(self, reason: str):
+        if not self.failed:
+            self.failed = True
+            logging.error(f"[ERROR]: acquisition worker failed for side {self.side_number}: {reason}")
+
+    def checkWorker(self, snapshot):
+        if snapshot is not None:
+            self.lock_timeouts = 0
+            return True
+        self.lock_timeouts += 1
+        if not self.process.is_alive():
+            self.fail(f"process exited with code {self.process.exitcode}")
+        elif self.lock_timeouts >= MAX_LOCK_TIMEOUTS:
+            self.fail(f"shared segment locked for {MAX_LOCK_TIMEOUTS * LOCK_TIMEOUT:.2f}s")
+        return False
+
+    def readHeader(self):
+        # a failed worker keeps reporting its last snapshot instead of blocking the event loop
+        if not self.failed:
+            header = self.counter.read()
+            if self.checkWorker(header):
+                self.header = header
+        return self.header
+
+    @property
+    def ready(self) -> bool:
+        status = self.readHeader()[0]
+        if status == STATUS_FAILED:
+            self.fail("gpio setup failed")
+        elif not self.failed and not self.process.is_alive():
+            self.fail(f"process exited with code {self.process.exitcode}")
+        return not self.failed and status == STATUS_READY
+
+    def readPulses(self) -> int:
+        _, _, generation, pulses, _, _ = self.readHeader()
+        # until the worker has applied our last start the segment still holds the previous dispense
+        return pulses if generation == self.generation else 0
+
+    def readTicks(self, since: int):
+        if not self.failed:
+            snapshot = self.counter.readTicks(since)
+            if self.checkWorker(snapshot):
+                self.header, ticks = snapshot
+                if self.header[2] == self.generation:
+                    return self.header[3], ticks
+        return self.readPulses(), []
+
+    def setRelay(self, level: int):
+        self.send("relay", level)
+
+    def startCounting(self):
+        self.generation = (self.generation + 1) & 0xFFFFFFFF
+        self.send("start", self.generation)
+
+    def stopCounting(self):
+        self.send("stop")
+
+    def armPreset(self, threshold: int):
+        self.send("preset", threshold)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.send("close")
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
@@ -4,14 +4,20 @@ import psutil
 from decimal import Decimal, ROUND_HALF_UP
 from config.loader import ConfigManager
 from src.hardware import PumpObject
+from src.gpiohub import GpioHub
+from src.directory import DirectoryCache
+from src.journal import Journal
+from src.writer import RecordWriter
+from src.events import (
+    EventBus, UpdateLiters, ResetPreset, UpdateButtonColor,
+    ResetButtonColor, CancelTimeout, EndErogation, RecordFailed
+)
 from src.gui import MainWindow, GuiSideObject, KeypadWindow
 from config.params import GuiSides, FuelSides
 from app.database import async_session
-from app.crud import drivers as autisti_crud
-from app.crud.erogations import createErogation
-from app.crud.totals import recordTotals
+from app.crud.vehicles import updateVehicleKm
 from app.schemas.erogations import ErogationCreate
-from datetime import datetime, timezone
+from uuid import uuid4
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class Controller:
@@ -30,10 +36,12 @@ class Controller:
         )
 
         self.params = self.config_manager.get_main_parameters()
-        self.q = asyncio.Queue(maxsize=100)
+        self.bus = EventBus(maxsize=100)
         self.sides = {}
-        self.validated_drivers = {}
-        self.validated_vehicles = {}
+        self.gpio_hub = GpioHub()
+        self.directory = DirectoryCache(self.params.directory_resync_interval)
+        self.journal = Journal()
+        self.writer = RecordWriter(self.journal, self.params.record_flush_window)
         self.view = MainWindow(self)
         self.card_validated = False
         self._temp_validated_driver = None
@@ -43,6 +51,7 @@ class Controller:
         self.active_tasks = set()
 
         self.createSides()
+        self.subscribeEvents()
 
     def createSides(self):
         for i in range(1, 3):
@@ -50,7 +59,7 @@ class Controller:
             gui_side = getattr(self.gui_sides, f"side_{i}")
 
             if fuel_side.side_exists and gui_side.side_exists:
-                pump_obj = PumpObject(fuel_side, i, self.q)
+                pump_obj = PumpObject(fuel_side, i, self.bus, self.gpio_hub, self.registerErogationRecord)
                 gui_obj = GuiSideObject(self.view, gui_side, i, self.sideClicked)
                 self.sides[f"side_{i}"] = (gui_obj, pump_obj)
 
@@ -73,6 +82,18 @@ class Controller:
             memory_usage = psutil.Process().memory_info().rss / 1024 / 1024
             task_count = len(asyncio.all_tasks())
             logging.info(f"[RESOURCES]: Memory usage: {memory_usage:.2f} MB, active tasks: {task_count}") 
+            logging.info(f"[RESOURCES]: {self.view.frame_stats.summary()}, {self.view.loop_lag_stats.summary()}")
+            self.view.frame_stats.reset()
+            self.view.loop_lag_stats.reset()
+            logging.info(f"[RESOURCES]: {self.bus.summary()}")
+            logging.info(f"[RESOURCES]: {self.directory.summary()}")
+            logging.info(f"[RESOURCES]: {self.writer.summary()}")
+            self.writer.resetStats()
+            self.bus.resetStats()
+            for _, pump_obj in self.sides.values():
+                logging.info(f"[RESOURCES]: {pump_obj.cutoff.summary()}")
+                logging.info(f"[RESOURCES]: {pump_obj.stateSummary()}")
+                pump_obj.resetStateStats()
             await asyncio.sleep(60)
 
     def rfidResponse(self, card_id):
@@ -93,21 +114,20 @@ class Controller:
         asyncio.create_task(self.validateCard(card_id))
 
     async def validateCard(self, card_id: str):
-        async with async_session() as session:
-            driver = await autisti_crud.getDriverByCard(session, card_id)
-            if driver:
-                logging.info(f"[INFO]: Card found in the DB: {card_id}")
-                self._temp_validated_driver = driver
-                if driver.request_pin:
-                    await self.promptForPin(driver)
-                elif driver.request_vehicle_id:
-                    await self.promptForVehicle()
-                else:
-                    self.handleRfidValidation()
+        driver = await self.directory.findDriver(card_id)
+        if driver:
+            logging.info(f"[INFO]: Card found in the DB: {card_id}")
+            self._temp_validated_driver = driver
+            if driver.request_pin:
+                await self.promptForPin(driver)
+            elif driver.request_vehicle_id:
+                await self.promptForVehicle()
             else:
-                logging.info(f"[INFO]: Card not found in the DB: {card_id}")
-                self.view.updateLabel(self.params.refused_card_text)
-                self.view.after(3000, self.view.updateLabel, self.params.automatic_mode_text)
+                self.handleRfidValidation()
+        else:
+            logging.info(f"[INFO]: Card not found in the DB: {card_id}")
+            self.view.updateLabel(self.params.refused_card_text)
+            self.view.after(3000, self.view.updateLabel, self.params.automatic_mode_text)
 
     async def promptForPin(self, driver):
         future = asyncio.get_event_loop().create_future()
@@ -155,67 +175,70 @@ class Controller:
             self.view.updateLabel(self.params.automatic_mode_text)
             return
 
-        from app.crud.vehicles import getVehicleById
+        vehicle = await self.directory.findVehicle(vehicle_id)
 
-        async with async_session() as session:
-            vehicle = await getVehicleById(session, vehicle_id) 
+        if not vehicle:
+            self.view.updateLabel(self.params.vehicle_not_found_text)
+            await asyncio.sleep(3)
+            self.view.updateLabel(self.params.automatic_mode_text)
+            return
+        
+        self._temp_validated_vehicle = vehicle
 
-            if not vehicle:
-                self.view.updateLabel(self.params.vehicle_not_found_text)
-                await asyncio.sleep(3)
-                self.view.updateLabel(self.params.automatic_mode_text)
-                return
-            
-            self._temp_validated_vehicle = vehicle
+        if getattr(vehicle, "request_vehicle_km", False):
+            future_km = asyncio.get_event_loop().create_future()
 
-            if getattr(vehicle, "request_vehicle_km", False):
-                future_km = asyncio.get_event_loop().create_future()
+            def kmCallback(value):
+                future_km.set_result(value)
 
-                def kmCallback(value):
-                    future_km.set_result(value)
+            keypad_window = KeypadWindow(self.view, "KILOMETERS", self.params.km_prompt_text, kmCallback)
 
-                keypad_window = KeypadWindow(self.view, "KILOMETERS", self.params.km_prompt_text, kmCallback)
+            try:
+                km_str = await asyncio.wait_for(future_km, timeout=20)
 
                 try:
-                    km_str = await asyncio.wait_for(future_km, timeout=20)
-
-                    try:
-                        km_value = int(km_str)
-                    except ValueError:
-                        self.view.updateLabel(self.params.km_error_text)
-                        await asyncio.sleep(3)
-                        self.view.updateLabel(self.params.automatic_mode_text)
-                        return
-                    
-                    if km_value <= int(vehicle.vehicle_total_km):
-                        self.view.updateLabel(self.params.km_error_text_2)
-                        await asyncio.sleep(3)
-                        self.view.updateLabel(self.params.automatic_mode_text)
-                        return
-                    
-                    vehicle.vehicle_total_km = str(km_value)
-                    await session.commit()
-                    logging.info(f"[INFO]: vehicle updated with new km: {km_value}") 
-                    
-                except asyncio.TimeoutError:
-                    keypad_window.destroy()
-                    self.view.updateLabel(self.params.selection_timeout_text)
+                    km_value = int(km_str)
+                except ValueError:
+                    self.view.updateLabel(self.params.km_error_text)
                     await asyncio.sleep(3)
                     self.view.updateLabel(self.params.automatic_mode_text)
                     return
                 
-            self.handleRfidValidation()
+                if km_value <= (vehicle.vehicle_total_km or 0):
+                    self.view.updateLabel(self.params.km_error_text_2)
+                    await asyncio.sleep(3)
+                    self.view.updateLabel(self.params.automatic_mode_text)
+                    return
+                
+                vehicle = vehicle._replace(vehicle_total_km=km_value)
+                self.directory.putVehicle(vehicle)
+                self._temp_validated_vehicle = vehicle
+                try:
+                    async with async_session() as session:
+                        await updateVehicleKm(session, vehicle.vehicle_id, vehicle.vehicle_total_km)
+                    logging.info(f"[INFO]: vehicle updated with new km: {km_value}") 
+                except Exception as e:
+                    logging.error(f"[ERROR]: vehicle km not saved, kept in cache only: {e}")
+                
+            except asyncio.TimeoutError:
+                keypad_window.destroy()
+                self.view.updateLabel(self.params.selection_timeout_text)
+                await asyncio.sleep(3)
+                self.view.updateLabel(self.params.automatic_mode_text)
+                return
+            
+        self.handleRfidValidation()
 
-    async def registerErogationRecord(self, side_number: int):
+    async def registerErogationRecord(self, event: EndErogation):
+        side_number = event.side_number
         _, pump_obj = self.sides.get(f"side_{side_number}")
         
-        liters = Decimal(pump_obj.pulser_counter) / Decimal(pump_obj.params.pulses_per_liter)
+        liters = Decimal(event.pulses) / Decimal(pump_obj.params.pulses_per_liter)
         liters = (liters / Decimal(pump_obj.params.calibration_factor)) \
                     .quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
-        driver = self.validated_drivers.get(side_number)
+        driver = event.driver
         if driver:
-            driver = self.validated_drivers[side_number]
             mode = "automatica"
             card = driver.card
             company = driver.company
@@ -226,7 +249,7 @@ class Controller:
             company = None
             driver_full_name = None
 
-        vehicle = self.validated_vehicles.get(side_number)
+        vehicle = event.vehicle
         if vehicle:
             vehicle_id       = vehicle.vehicle_id
             company_vehicle  = vehicle.company_vehicle
@@ -234,7 +257,8 @@ class Controller:
         else:
             vehicle_id = company_vehicle = vehicle_total_km = None
 
-        total_price = float(liters) * pump_obj.params.price
+        total_price = (liters * Decimal(str(pump_obj.params.price))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        flow_profile = event.flow_profile
 
         erogation_data = ErogationCreate(
             card = card,
@@ -246,33 +270,32 @@ class Controller:
             erogation_side = side_number,
             dispensed_liters = liters,
             dispensed_product = pump_obj.params.product,
-            erogation_timestamp = datetime.now(timezone.utc),
+            erogation_timestamp = event.timestamp,
             mode = mode,
-            total_erogation_price = f"{total_price:.2f}"
+            total_erogation_price = total_price
         )
 
-        async with async_session() as session:
-            try:
-                await recordTotals(
-                    session,
-                    dispenser_id=1,
-                    side=side_number,
-                    liters=liters
-                )
-
-                new_record = await createErogation(session, erogation_data)
-
-                await session.commit()
+        entry = {
+            "key": uuid4().hex,
+            "dispenser_id": 1,
+            "side": side_number,
+            "liters": str(liters),
+            "erogation": erogation_data.model_dump(mode="json"),
+            "profile": flow_profile
+        }
 
-                logging.info(
-                    f"[INFO]: New dispense record and totalizer updated for side: {side_number}: "
-                    f"{liters}L"
-                )
-                return new_record
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.journal.append, entry)
+        except Exception as e:
+            logging.error(f"[ERROR]: dispense not journaled for side {side_number}, record: {entry}: {e}")
+            raise
 
-            except Exception as e:
-                logging.error(f"[ERROR]: Error occoured, exception catched in registerErogationRecord: {e}")
-                return None
+        self.writer.wake()
+        logging.info(
+            f"[INFO]: New dispense journaled for side: {side_number}: "
+            f"{liters}L ({entry['key']})"
+        )
+        return entry["key"]
 
     def handleRfidValidation(self):   
         self.card_validated = True
@@ -310,8 +333,9 @@ class Controller:
             logging.warning("[WARNING]: No driver found in temporary variable.")
             return
 
-        self.validated_drivers[side_number] = self._temp_validated_driver
-        self.validated_vehicles[side_number] = self._temp_validated_vehicle
+        _, pump_obj = self.sides[f"side_{side_number}"]
+        pump_obj.driver = self._temp_validated_driver
+        pump_obj.vehicle = self._temp_validated_vehicle
 
         self._temp_validated_driver = None
         self._temp_validated_vehicle = None
@@ -346,52 +370,57 @@ class Controller:
         for side, (gui_obj, pump_obj) in self.sides.items():
             if pump_obj.params.side_exists and side != f"side_{active_side}" and not pump_obj.nozzle_status:
                 pump_obj.preset_value = 0
-                await pump_obj.cancelPresetTasks()
                 logging.info("[INFO]: Preset reset on inactive sides.")
                 gui_obj.updatePreset(pump_obj.preset_value)
 
-    async def processQupdates(self):
-        updates = []
-        while True:
-            update = await self.q.get()
-            updates.append(update)
-            await asyncio.sleep(0.5)
-            while not self.q.empty():
-                updates.append(await self.q.get())
-            for action, *args in updates:
-                if action == "endErogation":
-                    if f"side_{args[0]}" in self.sides:
-                        side_number = args[0]
-                        await self.registerErogationRecord(side_number)
-                elif action == "resetPreset":
-                    active_side = args[0]
-                    await self.resetPresetOnInactiveSides(active_side)
-                elif action == "updateLiters":
-                    if f"side_{args[0]}" in self.sides:
-                        gui_obj, _ = self.sides[f"side_{args[0]}"]
-                        self.view.after(0, gui_obj.updateLiters, args[1])
-                elif action == "updateButtonColor":
-                    if f"side_{args[0]}" in self.sides:
-                        gui_obj, _ = self.sides[f"side_{args[0]}"]
-                        self.view.after(0, gui_obj.updateButtonColor, gui_obj.guiparams.busy_button_color, gui_obj.guiparams.busy_button_border_color)
-                elif action == "resetButtonColor":
-                    if f"side_{args[0]}" in self.sides:
-                        gui_obj, _ = self.sides[f"side_{args[0]}"]
-                        self.view.after(0, gui_obj.updateButtonColor, gui_obj.guiparams.button_color, gui_obj.guiparams.button_border_color)
-                elif action == "cancelTimeout":
-                    if self.selection_timeout_task:
-                        self.selection_timeout_task.cancel()
-                        self.selection_timeout_task = None
-            updates.clear()
+    def subscribeEvents(self):
+        self.bus.subscribe(ResetPreset, self.onResetPreset)
+        self.bus.subscribe(UpdateLiters, self.onUpdateLiters)
+        self.bus.subscribe(UpdateButtonColor, self.onUpdateButtonColor)
+        self.bus.subscribe(ResetButtonColor, self.onResetButtonColor)
+        self.bus.subscribe(CancelTimeout, self.onCancelTimeout)
+        self.bus.subscribe(RecordFailed, self.onRecordFailed)
+
+    async def onResetPreset(self, event: ResetPreset):
+        await self.resetPresetOnInactiveSides(event.side_number)
+
+    def onUpdateLiters(self, event: UpdateLiters):
+        if f"side_{event.side_number}" in self.sides:
+            gui_obj, _ = self.sides[f"side_{event.side_number}"]
+            self.view.after(0, gui_obj.updateLiters, event.liters)
+
+    def onUpdateButtonColor(self, event: UpdateButtonColor):
+        if f"side_{event.side_number}" in self.sides:
+            gui_obj, _ = self.sides[f"side_{event.side_number}"]
+            self.view.after(0, gui_obj.updateButtonColor, gui_obj.guiparams.busy_button_color, gui_obj.guiparams.busy_button_border_color)
+
+    def onResetButtonColor(self, event: ResetButtonColor):
+        if f"side_{event.side_number}" in self.sides:
+            gui_obj, _ = self.sides[f"side_{event.side_number}"]
+            self.view.after(0, gui_obj.updateButtonColor, gui_obj.guiparams.button_color, gui_obj.guiparams.button_border_color)
+
+    def onCancelTimeout(self, event: CancelTimeout):
+        if self.selection_timeout_task:
+            self.selection_timeout_task.cancel()
+            self.selection_timeout_task = None
+
+    def onRecordFailed(self, event: RecordFailed):
+        self.view.after(0, self.view.updateLabel, f"ERRORE REGISTRAZIONE EROGAZIONE LATO {event.side_number}")
 
     async def run(self):
         logging.info(f"[INFO]: Main loop started: {asyncio.get_event_loop().is_running()}")
         try:
-            await asyncio.gather(
-                self.view.run(),
-                self.processQupdates(),
-                self.monitorResources()
-            )
+            tasks = [
+                asyncio.create_task(self.view.run()),
+                asyncio.create_task(self.bus.run()),
+                asyncio.create_task(self.monitorResources()),
+                asyncio.create_task(self.directory.run()),
+                asyncio.create_task(self.writer.run()),
+                *(asyncio.create_task(pump_obj.run()) for _, pump_obj in self.sides.values())
+            ]
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
         except Exception as e:
             logging.error(f"[ERROR]: Exception in main loop: {e}")
         finally:
@@ -401,6 +430,10 @@ class Controller:
         logging.info("[INFO]: Cleaning resources.")
         for _, pump in self.sides.values():
             pump.close()
+        self.gpio_hub.close()
+        await self.directory.close()
+        await self.writer.close()
+        self.journal.close()
         await self.cancelTasks()
 
 
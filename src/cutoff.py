@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+FLOW_WINDOW = 0.5
+LEARNING_RATE = 0.3
+MAX_LATENCY = 2.0
+# every side shares the state file, saves run on executor threads
+STATE_LOCK = threading.Lock()
+
+
+class PresetCutoff:
+    def __init__(self, side_number: int, initial_latency: float, poll_interval: float,
+                 state_path: str = "config/cutoff_state.json"):
+        self.side_number = side_number
+        self.side_key = f"side_{side_number}"
+        self.poll_interval = poll_interval
+        self.state_path = Path(state_path)
+        self.latency = initial_latency
+        self.learned_samples = 0
+        self.samples = deque()
+        self.target = 0
+        self.cut_pulses = None
+        self.cut_rate = 0.0
+        self.accuracy_count = 0
+        self.accuracy_abs_total = 0.0
+        self.accuracy_max = 0.0
+        self.loadState()
+
+    def loadState(self):
+        try:
+            if self.state_path.exists():
+                with open(self.state_path, 'r') as f:
+                    state = json.load(f).get(self.side_key)
+                if state:
+                    self.latency = state["latency"]
+                    self.learned_samples = state["samples"]
+        except Exception as e:
+            logging.error(f"[ERROR]: cutoff state not loaded for side {self.side_number}: {e}")
+
+    def saveState(self, side_state: dict):
+        try:
+            with STATE_LOCK:
+                state = {}
+                if self.state_path.exists():
+                    with open(self.state_path, 'r') as f:
+                        state = json.load(f)
+                state[self.side_key] = side_state
+                tmp_path = self.state_path.with_suffix(".tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logging.error(f"[ERROR]: cutoff state not saved for side {self.side_number}: {e}")
+
+    def begin(self, target_pulses: float):
+        self.samples.clear()
+        self.target = target_pulses
+        self.cut_pulses = None
+        self.cut_rate = 0.0
+
+    def flowRate(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, p0), (t1, p1) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return (p1 - p0) / (t1 - t0)
+
+    def update(self, now: float, pulses: int):
+        self.samples.append((now, pulses))
+        while len(self.samples) > 2 and now - self.samples[0][0] > FLOW_WINDOW:
+            self.samples.popleft()
+
+        remaining = self.target - pulses
+        if remaining <= 0:
+            return 0.0
+        rate = self.flowRate()
+        if rate <= 0:
+            return None
+        time_to_cut = remaining / rate - self.latency
+        if time_to_cut <= self.poll_interval:
+            return max(0.0, time_to_cut)
+        return None
+
+    def markCut(self, pulses: int):
+        self.cut_pulses = pulses
+        self.cut_rate = self.flowRate()
+
+    def learn(self, final_pulses: int, preset_liters: float, pulses_per_liter: float, calibration_factor: float):
+        if self.cut_pulses is None:
+            return
+        error = final_pulses / pulses_per_liter / calibration_factor - preset_liters
+        self.accuracy_count += 1
+        self.accuracy_abs_total += abs(error)
+        self.accuracy_max = max(self.accuracy_max, abs(error))
+        logging.info(f"[INFO]: preset error {error:+.3f} L for side {self.side_number}")
+
+        if self.cut_rate > 0:
+            observed = (final_pulses - self.cut_pulses) / self.cut_rate
+            observed = min(max(observed, 0.0), MAX_LATENCY)
+            self.latency += LEARNING_RATE * (observed - self.latency)
+            self.learned_samples += 1
+            side_state = {"latency": self.latency, "samples": self.learned_samples}
+            asyncio.get_running_loop().run_in_executor(None, self.saveState, side_state)
+        self.cut_pulses = None
+
+    def snapshot(self) -> dict:
+        return {
+            "dispenses": self.accuracy_count,
+            "mean_abs_error_l": round(self.accuracy_abs_total / self.accuracy_count, 3) if self.accuracy_count else 0.0,
+            "max_abs_error_l": round(self.accuracy_max, 3),
+            "learned_latency_s": round(self.latency, 3),
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (
+            f"preset accuracy side {self.side_number}: mean {s['mean_abs_error_l']} L, "
+            f"max {s['max_abs_error_l']} L over {s['dispenses']} dispenses, latency {s['learned_latency_s']} s"
+        )
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+from collections import namedtuple
+from sqlalchemy import select
+from app.database import async_session, engine
+from app.models.drivers import Driver
+from app.models.vehicles import Vehicle
+from app.crud.notify import DIRECTORY_CHANNEL
+from src.metrics import LatencyStats
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+LOOKUP_BUDGET = 0.001
+RETRY_DELAY = 5
+
+DriverEntry = namedtuple("DriverEntry", "card company driver_full_name request_pin request_vehicle_id pin")
+VehicleEntry = namedtuple("VehicleEntry", "vehicle_id company_vehicle request_vehicle_km vehicle_total_km plate")
+
+TABLES = {
+    "drivers": (Driver, Driver.card, DriverEntry),
+    "vehicles": (Vehicle, Vehicle.vehicle_id, VehicleEntry),
+}
+
+
+def columnsFor(model, entry_type):
+    return tuple(getattr(model, field) for field in entry_type._fields)
+
+
+class DirectoryCache:
+    def __init__(self, resync_interval: int = 300):
+        self.resync_interval = resync_interval
+        self.entries = {table: {} for table in TABLES}
+        self.loaded = False
+        self.changes = asyncio.Queue()
+        self.listener = None
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.notifications = 0
+        self.resyncs = 0
+        self.lookup_stats = LatencyStats("directory lookup", LOOKUP_BUDGET)
+
+    async def fetchAll(self, session, table):
+        model, _, entry_type = TABLES[table]
+        result = await session.execute(select(*columnsFor(model, entry_type)))
+        return {row[0]: entry_type(*row) for row in result.all()}
+
+    async def fetchOne(self, session, table, key):
+        model, key_column, entry_type = TABLES[table]
+        result = await session.execute(select(*columnsFor(model, entry_type)).where(key_column == key))
+        row = result.first()
+        return entry_type(*row) if row else None
+
+    async def resync(self):
+        async with async_session() as session:
+            entries = {table: await self.fetchAll(session, table) for table in TABLES}
+        self.entries = entries
+        self.loaded = True
+        self.resyncs += 1
+        logging.info(
+            f"[INFO]: directory cache synced: {len(entries['drivers'])} drivers, "
+            f"{len(entries['vehicles'])} vehicles"
+        )
+
+    async def applyChange(self, payload: str):
+        change = json.loads(payload)
+        table, key = change["table"], change["key"]
+        if table not in TABLES:
+            return
+        if key is None:
+            await self.resync()
+            return
+        async with async_session() as session:
+            entry = await self.fetchOne(session, table, key)
+        if entry is None:
+            self.entries[table].pop(key, None)
+        else:
+            self.entries[table][key] = entry
+
+    def onNotify(self, connection, pid, channel, payload):
+        self.notifications += 1
+        self.changes.put_nowait(payload)
+
+    def onTerminated(self, connection):
+        logging.warning("[WARNING]: directory listener connection lost")
+        self.changes.put_nowait(None)
+
+    async def listen(self):
+        self.listener = await engine.connect()
+        raw = await self.listener.get_raw_connection()
+        await raw.driver_connection.add_listener(DIRECTORY_CHANNEL, self.onNotify)
+        raw.driver_connection.add_termination_listener(self.onTerminated)
+        logging.info(f"[INFO]: listening for directory changes on {DIRECTORY_CHANNEL}")
+
+    async def closeListener(self):
+        if self.listener is None:
+            return
+        # invalidate so the pool drops the connection instead of reusing it with the listeners attached
+        try:
+            await self.listener.invalidate()
+            await self.listener.close()
+        except Exception as e:
+            logging.error(f"[ERROR]: directory listener not closed cleanly: {e}")
+        self.listener = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_sync = 0
+        while True:
+            try:
+                if self.listener is None:
+                    await self.listen()
+                    next_sync = 0
+                if loop.time() >= next_sync:
+                    await self.resync()
+                    next_sync = loop.time() + self.resync_interval
+                try:
+                    payload = await asyncio.wait_for(self.changes.get(), next_sync - loop.time())
+                except asyncio.TimeoutError:
+                    continue
+                if payload is None:
+                    raise ConnectionError("listener connection terminated")
+                await self.applyChange(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"[ERROR]: directory cache refresh failed, retrying in {RETRY_DELAY}s: {e}")
+                await self.closeListener()
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def find(self, table: str, key: str):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        if self.loaded:
+            entry = self.entries[table].get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        else:
+            self.fallbacks += 1
+            async with async_session() as session:
+                entry = await self.fetchOne(session, table, key)
+        self.lookup_stats.record(loop.time() - start)
+        return entry
+
+    async def findDriver(self, card: str):
+        return await self.find("drivers", card)
+
+    async def findVehicle(self, vehicle_id: str):
+        return await self.find("vehicles", vehicle_id)
+
+    def putVehicle(self, vehicle: VehicleEntry):
+        self.entries["vehicles"][vehicle.vehicle_id] = vehicle
+
+    def summary(self) -> str:
+        return (
+            f"directory: {len(self.entries['drivers'])} drivers, {len(self.entries['vehicles'])} vehicles, "
+            f"hits {self.hits}, misses {self.misses}, db fallbacks {self.fallbacks}, "
+            f"notifications {self.notifications}, resyncs {self.resyncs}, {self.lookup_stats.summary()}"
+        )
+
+    async def close(self):
+        await self.closeListener()
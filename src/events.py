@@ -0,0 +1,114 @@
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+from src.metrics import LatencyStats
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DISPATCH_BUDGET = 0.05
+
+
+@dataclass(frozen=True)
+class Event:
+    side_number: Optional[int]
+
+    def coalesceKey(self):
+        return None
+
+
+@dataclass(frozen=True)
+class UpdateLiters(Event):
+    liters: float
+
+    def coalesceKey(self):
+        return (UpdateLiters, self.side_number)
+
+
+@dataclass(frozen=True)
+class ResetPreset(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class UpdateButtonColor(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class ResetButtonColor(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class CancelTimeout(Event):
+    pass
+
+
+@dataclass(frozen=True)
+class EndErogation(Event):
+    pulses: int
+    flow_profile: Optional[dict]
+    driver: Any
+    vehicle: Any
+    timestamp: datetime
+
+
+@dataclass(frozen=True)
+class RecordFailed(Event):
+    pass
+
+
+class EventBus:
+    def __init__(self, maxsize: int = 100):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.handlers = {}
+        self.latest = {}
+        self.max_depth = 0
+        self.coalesced = 0
+        self.dispatch_stats = LatencyStats("event dispatch", DISPATCH_BUDGET)
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    async def publish(self, event: Event):
+        key = event.coalesceKey()
+        if key is not None:
+            if key in self.latest:
+                self.latest[key] = event
+                self.coalesced += 1
+                return
+            self.latest[key] = event
+        await self.queue.put((asyncio.get_running_loop().time(), key, event))
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    async def callHandler(self, handler, event):
+        try:
+            result = handler(event)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logging.error(f"[ERROR]: handler {handler.__name__} failed for {type(event).__name__}: {e}")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            published, key, event = await self.queue.get()
+            if key is not None:
+                event = self.latest.pop(key, event)
+            self.dispatch_stats.record(loop.time() - published)
+            for handler in self.handlers.get(type(event), ()):
+                await self.callHandler(handler, event)
+
+    def summary(self) -> str:
+        return (
+            f"event queue depth {self.queue.qsize()} (max {self.max_depth}), "
+            f"coalesced {self.coalesced}, {self.dispatch_stats.summary()}"
+        )
+
+    def resetStats(self):
+        self.max_depth = self.queue.qsize()
+        self.coalesced = 0
+        self.dispatch_stats.reset()
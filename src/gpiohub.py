@@ -0,0 +1,90 @@
+import logging
+import threading
+import pigpio
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+class GpioHub:
+    def __init__(self):
+        self.handlers = {}
+        self.callbacks = {}
+        self.outputs = set()
+        self.lock = threading.Lock()
+        try:
+            self.pi = pigpio.pi()
+        except Exception as e:
+            logging.error(f"[ERROR]: exception raised while connecting to pigpiod: {e}")
+            self.pi = None
+
+        if self.pi and self.pi.connected:
+            logging.info("[INFO]: shared pigpiod connection opened.")
+        else:
+            logging.warning("[WARNING]: PIGPIO not working, gpio hub disabled")
+            self.pi = None
+
+    @property
+    def connected(self) -> bool:
+        return self.pi is not None
+
+    def setupInput(self, pin: int, pull=pigpio.PUD_UP, glitch_filter: int = 0):
+        self.pi.set_mode(pin, pigpio.INPUT)
+        self.pi.set_pull_up_down(pin, pull)
+        if glitch_filter:
+            self.pi.set_glitch_filter(pin, glitch_filter)
+
+    def setupOutput(self, pin: int, level: int = 0):
+        self.pi.set_mode(pin, pigpio.OUTPUT)
+        self.pi.write(pin, level)
+        self.outputs.add(pin)
+
+    def register(self, pin: int, edge: int, func):
+        with self.lock:
+            key = (pin, edge)
+            self.handlers.setdefault(key, []).append(func)
+            if key not in self.callbacks:
+                self.callbacks[key] = self.pi.callback(
+                    pin, edge, lambda gpio, level, tick: self.dispatch(key, gpio, level, tick)
+                )
+
+    def tally(self, pin: int, edge: int):
+        with self.lock:
+            cb = self.pi.callback(pin, edge)
+            self.callbacks[("tally", pin, edge)] = cb
+        return cb
+
+    def dispatch(self, key, gpio, level, tick):
+        for func in self.handlers.get(key, ()):
+            func(gpio, level, tick)
+
+    def write(self, pin: int, level: int):
+        if self.pi:
+            self.pi.write(pin, level)
+
+    def writeBatch(self, levels: dict):
+        if not self.pi:
+            return
+        set_mask = clear_mask = 0
+        for pin, level in levels.items():
+            if pin > 31:
+                self.pi.write(pin, level)
+            elif level:
+                set_mask |= 1 << pin
+            else:
+                clear_mask |= 1 << pin
+        if clear_mask:
+            self.pi.clear_bank_1(clear_mask)
+        if set_mask:
+            self.pi.set_bank_1(set_mask)
+
+    def close(self):
+        if not self.pi:
+            return
+        self.writeBatch({pin: 0 for pin in self.outputs})
+        for cb in self.callbacks.values():
+            cb.cancel()
+        self.callbacks.clear()
+        self.handlers.clear()
+        self.pi.stop()
+        self.pi = None
+        logging.info("[INFO]: gpio hub closed, all outputs released.")
@@ -1,9 +1,15 @@
 import customtkinter as ctk
+import _tkinter
 from config.params import GuiParameters
+from src.metrics import LatencyStats
 import asyncio
 import logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+FRAME_INTERVAL = 1 / 30
+FRAME_BUDGET = 0.012
+LOOP_LAG_BUDGET = 0.02
+
 class GuiSideObject:
     def __init__(self, app: ctk.CTk, guiparams: GuiParameters, side_number: int, on_click_callback):
         self.app = app 
@@ -185,6 +191,9 @@ class MainWindow(ctk.CTk):
     def __init__(self, controller):
         super().__init__() 
         self.controller = controller 
+        self.running = True 
+        self.frame_stats = LatencyStats("gui frame", FRAME_BUDGET) 
+        self.loop_lag_stats = LatencyStats("loop lag", LOOP_LAG_BUDGET) 
 
         ctk.set_appearance_mode("light") 
         self.geometry('1024x600')
@@ -233,11 +242,22 @@ class MainWindow(ctk.CTk):
 
     def closeGui(self):
         logging.info("[INFO]: closing window")
+        self.running = False 
         self.destroy() 
 
+    def pumpEvents(self, loop, deadline):
+        while loop.time() < deadline: 
+            if not self.tk.dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT): 
+                break 
+
     async def run(self):
-        logging.info(f"[INFO]: GUI event loop running: {asyncio.get_event_loop().is_running()}")
-        while True:
-            self.update_idletasks() 
-            self.update() 
-            await asyncio.sleep(.5)
\ No newline at end of file
+        loop = asyncio.get_running_loop() 
+        logging.info(f"[INFO]: GUI event loop running: {loop.is_running()}")
+        next_frame = loop.time() 
+        while self.running:
+            frame_start = loop.time() 
+            self.loop_lag_stats.record(max(0.0, frame_start - next_frame)) 
+            self.pumpEvents(loop, frame_start + FRAME_BUDGET) 
+            self.frame_stats.record(loop.time() - frame_start) 
+            next_frame = max(frame_start + FRAME_INTERVAL, loop.time()) 
+            await asyncio.sleep(next_frame - loop.time()) 
\ No newline at end of file
@@ -1,58 +1,145 @@
 import asyncio
 import pigpio
 import logging
+from datetime import datetime, timezone
+from enum import Enum
+from src.acquisition import AcquisitionClient
+from src.cutoff import PresetCutoff
+from src.watchdog import CutoffScript, REASON_PRESET
+from src.timeline import PulseTimeline
+from src.metrics import LatencyStats
+from src.events import (
+    UpdateLiters, ResetPreset, UpdateButtonColor,
+    ResetButtonColor, CancelTimeout, EndErogation, RecordFailed
+)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+PRESET_POLL_INTERVAL = 0.02
+TIMELINE_SAMPLE_INTERVAL = 0.05
+LITERS_UPDATE_INTERVAL = 1.0
+STOP_SETTLE_TIME = 1.0
+SIM_PULSER_DELAY = 10
+SIM_PULSER_RATE = 10
+
+
+class PumpState(Enum):
+    IDLE = "idle"
+    AUTHORIZED = "authorized"
+    PRIMING = "priming"
+    DISPENSING = "dispensing"
+    STOPPING = "stopping"
+    RECORDING = "recording"
+
+
+class Signal(Enum):
+    NOZZLE_UP = "nozzle_up"
+    NOZZLE_DOWN = "nozzle_down"
+    AUTHORIZE = "authorize"
+    DEAUTHORIZE = "deauthorize"
+    PRESET_REACHED = "preset_reached"
+    NO_FLOW = "no_flow"
+    TIMER = "timer"
+    TICK = "tick"
+
 class PumpObject:
-    def __init__(self, params, side_number, q):
+    def __init__(self, params, side_number, bus, hub, recorder=None):
         self.params = params 
         self.side_number = side_number 
-        self.q = q 
+        self.bus = bus 
+        self.hub = hub 
+        self.recorder = recorder 
         self.loop = asyncio.get_event_loop() 
+        self.pulser_tally = None 
+        self.acquisition = None 
+        self.cutoff_script = None 
 
-        try:
-            self.pi = pigpio.pi()
-        except Exception as e:
-            logging.error(f"[ERROR]: exception raised while initializing gpio pins for side {self.side_number}: {e}")
-            self.pi = None
+        if self.params.acquisition_process: 
+            try:
+                self.acquisition = AcquisitionClient(self.params, self.side_number) 
+            except Exception as e:
+                logging.error(f"[ERROR]: acquisition worker not started for side {self.side_number}: {e}")
 
-        if self.pi and self.pi.connected:
+        self.pi = self.hub.pi 
+
+        if self.pi:
             logging.info(f"[INFO]: gpio initialized successfully for side {self.side_number}.")
             try:
                 self.setupGpio() 
             except Exception as e:
                 logging.error(f"[ERROR]: gpio configuration failed for side {self.side_number}: {e}")
+            if self.params.daemon_cutoff and self.acquisition is None and not self.params.simulation_pulser: 
+                try:
+                    self.cutoff_script = CutoffScript(self.pi, self.params, self.side_number, self.daemonCutoff) 
+                except Exception as e:
+                    logging.error(f"[ERROR]: daemon cutoff script not available for side {self.side_number}: {e}")
         else:
             logging.warning(f"[WARNING]: PIGPIO not working for side {self.side_number}")
-            self.pi = None 
 
         self.nozzle_status = False 
         self.pump_is_busy = False 
         self.pulser_counter = 0 
-        self.task = None 
-        self.preset_task = None 
-        self.sim_counter_task = None 
-        self.data_rendering_task = None 
         self.preset_value = 0 
-        self.authorized = False 
-        self.erogation_strted = False  
-        
+        self.cutoff = PresetCutoff(self.side_number, self.params.relay_cutoff_latency, PRESET_POLL_INTERVAL) 
+        self.cutoff_preset = 0 
+        self.timeline = PulseTimeline() 
+        self.timeline_pulses = 0 
+        self.timeline_per_edge = (
+            self.pi is not None and self.acquisition is None
+            and self.params.pulse_counting_mode == "callback" and not self.params.simulation_pulser
+        ) 
+        self.timeline_from_worker = (
+            self.pi is not None and self.acquisition is not None and not self.params.simulation_pulser
+        ) 
+        self.flow_profile = None 
+        self.driver = None 
+        self.vehicle = None 
+        self._authorized = False 
+
+        self.state = PumpState.IDLE 
+        self.state_since = self.loop.time() 
+        self.signals = asyncio.Queue() 
+        self.timer = None 
+        self.timer_generation = 0 
+        self.tick_handle = None 
+        self.cut_due = None 
+        self.last_liters_update = None 
+        self.dispense_started = None 
+        self.sim_started = None 
+        self.sim_pulses = 0 
+        self.state_stats = {state: LatencyStats(f"side {self.side_number} {state.value}") for state in PumpState} 
+        self.signal_stats = LatencyStats(f"side {self.side_number} signal", PRESET_POLL_INTERVAL) 
+        self.handlers = {
+            PumpState.IDLE: self.onIdle,
+            PumpState.AUTHORIZED: self.onAuthorized,
+            PumpState.PRIMING: self.onPriming,
+            PumpState.DISPENSING: self.onDispensing,
+            PumpState.STOPPING: self.onStopping,
+            PumpState.RECORDING: self.onRecording,
+        } 
+        self.enter_actions = {
+            PumpState.PRIMING: self.enterPriming,
+            PumpState.DISPENSING: self.enterDispensing,
+            PumpState.STOPPING: self.enterStopping,
+            PumpState.RECORDING: self.enterRecording,
+        } 
+
         self.checkNozzlePolarity() 
 
     def setupGpio(self):
         if self.pi: 
-            self.pi.set_mode(self.params.pulser_pin, pigpio.INPUT) 
-            self.pi.set_pull_up_down(self.params.pulser_pin, pigpio.PUD_UP) 
-            self.pi.callback(self.params.pulser_pin, pigpio.FALLING_EDGE, self.updateCounter) 
+            if self.acquisition is None: 
+                self.hub.setupInput(self.params.pulser_pin, pigpio.PUD_UP) 
+                if self.params.pulse_counting_mode == "tally": 
+                    self.pulser_tally = self.hub.tally(self.params.pulser_pin, pigpio.FALLING_EDGE) 
+                else:
+                    self.hub.register(self.params.pulser_pin, pigpio.FALLING_EDGE, self.updateCounter) 
 
-            self.pi.set_mode(self.params.nozzle_pin, pigpio.INPUT) 
-            self.pi.set_pull_up_down(self.params.nozzle_pin, pigpio.PUD_UP) 
-            self.pi.callback(self.params.nozzle_pin, pigpio.EITHER_EDGE, self.handleNozzles) 
-            self.pi.set_glitch_filter(self.params.nozzle_pin, 100000) 
+            self.hub.setupInput(self.params.nozzle_pin, pigpio.PUD_UP, glitch_filter=100000) 
+            self.hub.register(self.params.nozzle_pin, pigpio.EITHER_EDGE, self.handleNozzles) 
 
-            self.pi.set_mode(self.params.relay_pin, pigpio.OUTPUT) 
-            self.pi.write(self.params.relay_pin, 0) 
+            if self.acquisition is None: 
+                self.hub.setupOutput(self.params.relay_pin, 0) 
             logging.info(f"[DEBUG]: correct PIGPIO configuration for the side {self.side_number}")
 
     def checkNozzlePolarity(self):
@@ -66,16 +153,97 @@ class PumpObject:
     def updateCounter(self, gpio, level, tick):
         if self.pump_is_busy: 
             self.pulser_counter += 1 
-            logging.info(f"[INFO]: counter: {self.pulser_counter:.2f}") 
+            if self.timeline_per_edge: 
+                self.timeline.record(tick) 
 
-    async def simCounter(self):
-        await asyncio.sleep(10) 
-        logging.info("[INFO]: no physical impulse detected, start simulation") 
-        if self.pulser_counter == 0: 
-            while True:
-                self.pulser_counter += 1 
-                logging.info(f"[INFO]: sim counter: {self.pulser_counter:.2f}")
-                await asyncio.sleep(0.1) 
+    def readCounter(self):
+        if self.acquisition is not None: 
+            return self.pulser_counter + self.acquisition.readPulses() 
+        if self.pulser_tally is not None and self.pump_is_busy: 
+            return self.pulser_counter + self.pulser_tally.tally() 
+        return self.pulser_counter 
+
+    def resetCounter(self):
+        self.pulser_counter = 0 
+        if self.acquisition is not None: 
+            self.acquisition.startCounting() 
+        if self.pulser_tally is not None: 
+            self.pulser_tally.reset_tally() 
+
+    def latchCounter(self):
+        if self.acquisition is not None: 
+            self.acquisition.stopCounting() 
+        if self.pulser_tally is not None and self.pump_is_busy: 
+            self.pulser_counter += self.pulser_tally.tally() 
+
+    def timelineTick(self):
+        # the worker stamps pulses with ticks of the same pigpiod, so its timeline shares this base
+        if self.timeline_per_edge or self.timeline_from_worker: 
+            return self.pi.get_current_tick() 
+        return int(self.loop.time() * 1000000) 
+
+    def sampleTimeline(self):
+        if self.timeline_from_worker: 
+            pulses, ticks = self.acquisition.readTicks(self.timeline_pulses) 
+            if ticks: 
+                # pulses that already left the worker's tick ring are folded into the oldest tick still in it
+                self.timeline.record(ticks[0], pulses - self.timeline_pulses - len(ticks) + 1) 
+                for tick in ticks[1:]: 
+                    self.timeline.record(tick) 
+            self.timeline_pulses = pulses 
+            return 
+        pulses = self.readCounter() 
+        if not self.timeline_per_edge and pulses > self.timeline_pulses: 
+            self.timeline.record(self.timelineTick(), pulses - self.timeline_pulses) 
+        self.timeline_pulses = pulses 
+
+    def setRelay(self, level):
+        if self.acquisition is not None: 
+            self.acquisition.setRelay(level) 
+        else:
+            self.hub.write(self.params.relay_pin, level) 
+
+    @property
+    def relayAvailable(self):
+        if self.acquisition is not None: 
+            return self.acquisition.ready 
+        return self.pi is not None 
+
+    @property
+    def authorized(self):
+        return self._authorized 
+
+    @authorized.setter
+    def authorized(self, value):
+        self._authorized = value 
+        self.post(Signal.AUTHORIZE if value else Signal.DEAUTHORIZE) 
+
+    def post(self, signal, generation=None):
+        self.signals.put_nowait((signal, generation, self.loop.time())) 
+
+    def setTimer(self, delay):
+        self.cancelTimer() 
+        self.timer_generation += 1 
+        self.timer = self.loop.call_later(delay, self.post, Signal.TIMER, self.timer_generation) 
+
+    def cancelTimer(self):
+        if self.timer: 
+            self.timer.cancel() 
+            self.timer = None 
+        self.timer_generation += 1 
+
+    def scheduleTick(self, delay):
+        self.cancelTick() 
+        self.tick_handle = self.loop.call_later(delay, self.post, Signal.TICK) 
+
+    def cancelTick(self):
+        if self.tick_handle: 
+            self.tick_handle.cancel() 
+            self.tick_handle = None 
+
+    def daemonCutoff(self, reason, pulses):
+        signal = Signal.PRESET_REACHED if reason == REASON_PRESET else Signal.NO_FLOW 
+        self.loop.call_soon_threadsafe(self.post, signal) 
 
     def handleNozzles(self, gpio, level, tick):
         if not self.loop or not self.loop.is_running(): 
@@ -83,138 +251,257 @@ class PumpObject:
             return 
         
         if level == self.high: 
-            self.loop.create_task(self.nozzleUp()) 
+            self.loop.call_soon_threadsafe(self.post, Signal.NOZZLE_UP) 
         elif level == self.low: 
-            self.loop.create_task(self.nozzleDown()) 
+            self.loop.call_soon_threadsafe(self.post, Signal.NOZZLE_DOWN) 
 
     def setPreset(self, liters):
         self.preset_value += liters 
         logging.info(f"[INFO]: preset set to: {self.preset_value} L, for side {self.side_number}")
-    
-    async def cancelDispensingTasks(self):
-        if self.task and not self.task.done(): 
-            self.task.cancel() 
-            try:
-                await self.task
-            except asyncio.CancelledError: 
-                logging.info(f"[INFO]: Dispensing task cancelled for side {self.side_number}.")
 
-    async def cancelPresetTasks(self):
-        if self.preset_task and not self.preset_task.done(): 
-            self.preset_task.cancel() 
-            try:
-                await self.preset_task
-            except asyncio.CancelledError: 
-                logging.info(f"[INFO]: preset task cancelled for side {self.side_number}")
-        logging.info(f"[INFO]: preset set to 0 for side {self.side_number}")
-
-    async def cancelSimCounterTasks(self):
-        if self.sim_counter_task and not self.sim_counter_task.done(): 
-            self.sim_counter_task.cancel() 
-            try:
-                await self.sim_counter_task
-            except asyncio.CancelledError: 
-                logging.info(f"[INFO]: sim counter task cancelled for side {self.side_number}")
+    async def run(self):
+        logging.info(f"[INFO]: dispense state machine started for side {self.side_number}")
+        try:
+            while True:
+                signal, generation, posted = await self.signals.get() 
+                self.signal_stats.record(self.loop.time() - posted) 
+                if signal is Signal.TIMER and generation != self.timer_generation: 
+                    continue 
+                try:
+                    await self.handlers[self.state](signal) 
+                except Exception as e: 
+                    logging.error(f"[ERROR]: {signal.value} failed in state {self.state.value} for side {self.side_number}: {e}")
+        finally:
+            self.cancelTimer() 
+            self.cancelTick() 
 
-    async def cancelDataRenderingTasks(self):
-        if self.data_rendering_task and not self.data_rendering_task.done(): 
-            self.data_rendering_task.cancel() 
-            try:
-                await self.data_rendering_task
-            except asyncio.CancelledError: 
-                logging.info(f"[INFO]: rendering task data cancelled for side {self.side_number}")
+    async def transition(self, state):
+        now = self.loop.time() 
+        elapsed = now - self.state_since 
+        self.state_stats[self.state].record(elapsed) 
+        logging.info(f"[INFO]: side {self.side_number} {self.state.value} -> {state.value} after {elapsed * 1000:.0f} ms")
+        self.state = state 
+        self.state_since = now 
+        self.cancelTimer() 
+        enter = self.enter_actions.get(state) 
+        if enter: 
+            await enter() 
 
-    async def monitorPreset(self):
-        try:
-            while self.preset_value and self.pump_is_busy: 
-                await asyncio.sleep(0.1) 
-                preset = self.preset_value * self.params.pulses_per_liter * self.params.calibration_factor 
-                if self.pulser_counter >= preset: 
-                    logging.info(f"[INFO]: preset reached, stop dispensing for the side {self.side_number}")
-                    await self.cancelDispensingTasks() 
-                    self.task = asyncio.create_task(self.stopErogation()) 
-                    break 
-        except asyncio.CancelledError: 
-            logging.info(f"[INFO]: preset monitoring task cancelled for side {self.side_number}.")
-
-    async def nozzleUp(self):
+    async def liftNozzle(self):
         logging.info(f"[INFO]: nozzle raised for side {self.side_number}")
         self.nozzle_status = True 
-        await self.q.put(("resetPreset", self.side_number)) 
-        await self.q.put(("updateButtonColor", self.side_number)) 
-        if self.params.automatic_mode and not self.authorized: 
+        await self.bus.publish(ResetPreset(self.side_number)) 
+        await self.bus.publish(UpdateButtonColor(self.side_number)) 
+
+    async def hangNozzle(self):
+        logging.info(f"[INFO]: nozzle released for side {self.side_number}") 
+        self.nozzle_status = False 
+        self._authorized = False 
+        await self.bus.publish(ResetButtonColor(self.side_number)) 
+
+    async def clearPreset(self):
+        self.preset_value = 0 
+        await self.bus.publish(ResetPreset(None)) 
+
+    async def startFromNozzle(self):
+        if self.params.automatic_mode and not self._authorized: 
             logging.info(f"[INFO]: attempted delivery in automatic mode, unauthorized {self.side_number}")
             return 
-        await self.cancelDispensingTasks() 
-        self.task = asyncio.create_task(self.startErogation()) 
+        await self.transition(PumpState.PRIMING) 
 
+    async def onIdle(self, signal):
+        if signal is Signal.NOZZLE_UP: 
+            await self.liftNozzle() 
+            await self.startFromNozzle() 
+        elif signal is Signal.NOZZLE_DOWN: 
+            await self.hangNozzle() 
+            await self.clearPreset() 
+        elif signal is Signal.AUTHORIZE and self._authorized and self.params.automatic_mode and not self.nozzle_status: 
+            await self.transition(PumpState.AUTHORIZED) 
 
-    async def nozzleDown(self):
-        logging.info(f"[INFO]: nozzle released for side {self.side_number}") 
-        self.nozzle_status = False 
-        self.authorized = False 
-        await self.q.put(("resetButtonColor", self.side_number)) 
-        await self.cancelDispensingTasks() 
-        self.task = asyncio.create_task(self.stopErogation()) 
-        await asyncio.sleep(3) 
-    
-    async def monitorCounter(self):
-        while True:
-            liters = self.pulser_counter / self.params.pulses_per_liter 
-            calibrated_liters = liters / self.params.calibration_factor 
-            await self.q.put(("updateLiters", self.side_number, calibrated_liters)) 
-            await asyncio.sleep(1) 
+    async def onAuthorized(self, signal):
+        if signal is Signal.NOZZLE_UP: 
+            await self.liftNozzle() 
+            await self.startFromNozzle() 
+        elif signal is Signal.NOZZLE_DOWN: 
+            await self.hangNozzle() 
+            await self.clearPreset() 
+            await self.transition(PumpState.IDLE) 
+        elif signal is Signal.DEAUTHORIZE: 
+            await self.transition(PumpState.IDLE) 
 
-    async def startErogation(self):
-        try:
-            if self.params.automatic_mode: 
-                await self.q.put(("cancelTimeout", self.side_number)) 
-            
-            self.pulser_counter = 0 
-            await asyncio.sleep(self.params.relay_activation_timer) 
-            self.pump_is_busy = True 
-            logging.info(f"[INFO]: dispensing started for side {self.side_number}") 
-            if self.pi: 
-                self.pi.write(self.params.relay_pin, 1) 
-            else:
-                logging.info(f"[INFO]: PIGPIO failed, exception occoured on relay activation {self.side_number}")
-
-            self.erogation_strted = True 
-
-            if self.preset_value > 0: 
-                if self.preset_task: 
-                    self.cancelPresetTasks() 
-                self.preset_task = asyncio.create_task(self.monitorPreset()) 
-            self.data_rendering_task = asyncio.create_task(self.monitorCounter()) 
-            if self.params.simulation_pulser: 
-                self.sim_counter_task = asyncio.create_task(self.simCounter()) 
-                logging.info(f"[INFO]: simulation counter started for side {self.side_number}")
-            await self.checkMaxTiming() 
-        except Exception as e: 
-            logging.error(f"[ERROR]:exception catched in startErogation method for side {self.side_number}: {e}")
-
-    async def stopErogation(self):
-        self.pump_is_busy = False 
-        await self.q.put(("resetPreset", None)) 
+    async def onPriming(self, signal):
+        if signal is Signal.TIMER: 
+            await self.transition(PumpState.DISPENSING) 
+        elif signal is Signal.NOZZLE_DOWN: 
+            await self.hangNozzle() 
+            await self.clearPreset() 
+            await self.transition(PumpState.IDLE) 
+
+    async def onDispensing(self, signal):
+        if signal is Signal.TICK: 
+            await self.dispenseTick() 
+        elif signal is Signal.TIMER: 
+            if self.readCounter() == 0: 
+                logging.info(f"[INFO]: no pulses after {self.params.timeout_reached_without_dispensing}s, stop dispensing for the side {self.side_number}")
+                await self.transition(PumpState.STOPPING) 
+        elif signal is Signal.NOZZLE_DOWN: 
+            await self.hangNozzle() 
+            await self.transition(PumpState.STOPPING) 
+        elif signal is Signal.PRESET_REACHED: 
+            self.cutoff.markCut(self.readCounter()) 
+            logging.info(f"[INFO]: preset reached in pigpiod, stop dispensing for the side {self.side_number}")
+            await self.transition(PumpState.STOPPING) 
+        elif signal is Signal.NO_FLOW: 
+            logging.info(f"[INFO]: no flow detected in pigpiod, stop dispensing for the side {self.side_number}")
+            await self.transition(PumpState.STOPPING) 
+
+    async def onStopping(self, signal):
+        if signal is Signal.TICK: 
+            await self.dispenseTick() 
+        elif signal is Signal.TIMER: 
+            await self.transition(PumpState.RECORDING) 
+        elif signal is Signal.NOZZLE_DOWN: 
+            await self.hangNozzle() 
+        elif signal is Signal.NOZZLE_UP: 
+            await self.liftNozzle() 
+
+    async def onRecording(self, signal):
+        logging.info(f"[INFO]: {signal.value} ignored while recording for side {self.side_number}")
+
+    async def enterPriming(self):
+        if self.params.automatic_mode: 
+            await self.bus.publish(CancelTimeout(self.side_number)) 
+        self.setTimer(self.params.relay_activation_timer) 
+
+    async def enterDispensing(self):
+        self.resetCounter() 
+        self.timeline.reset(self.timelineTick()) 
+        self.timeline_pulses = 0 
+        self.flow_profile = None 
+        self.pump_is_busy = True 
+        self.cut_due = None 
+        self.last_liters_update = None 
+        self.dispense_started = self.loop.time() 
+        self.sim_started = None 
+        self.sim_pulses = 0 
+        logging.info(f"[INFO]: dispensing started for side {self.side_number}") 
+        if self.relayAvailable: 
+            self.setRelay(1) 
+        elif self.acquisition is not None: 
+            logging.error(f"[ERROR]: acquisition worker not ready, relay not activated for side {self.side_number}")
+        else:
+            logging.info(f"[INFO]: PIGPIO failed, exception occoured on relay activation {self.side_number}")
+
+        preset_pulses = self.preset_value * self.params.pulses_per_liter * self.params.calibration_factor 
+        if self.cutoff_script: 
+            self.cutoff_script.start(preset_pulses, self.params.timeout_reached_without_dispensing) 
+        self.cutoff_preset = self.preset_value 
+        self.cutoff.begin(preset_pulses) 
+        if self.preset_value > 0 and self.acquisition is not None: 
+            self.acquisition.armPreset(int(preset_pulses)) 
+
+        self.setTimer(self.params.timeout_reached_without_dispensing) 
+        await self.dispenseTick() 
+
+    async def enterStopping(self):
+        self.cancelTick() 
+        if self.cutoff_script: 
+            self.cutoff_script.stop() 
+        self.setRelay(0) 
+        await self.clearPreset() 
         logging.info(f"[INFO]: dispensing finished for side {self.side_number}") 
-        if self.pi: 
-            self.pi.write(self.params.relay_pin, 0) 
-        self.preset_value = 0 
-        await self.cancelPresetTasks() 
-        await self.cancelSimCounterTasks() 
-        await asyncio.sleep(1) 
-        await self.cancelDataRenderingTasks() 
-        if self.erogation_strted == True: 
-            await self.q.put(("endErogation", self.side_number)) 
-        self.erogation_strted = False 
-    
-    async def checkMaxTiming(self):
-        await asyncio.sleep(self.params.timeout_reached_without_dispensing) 
-        if self.pulser_counter == 0: 
-            await self.stopErogation() 
+        self.setTimer(STOP_SETTLE_TIME) 
+        self.scheduleTick(TIMELINE_SAMPLE_INTERVAL) 
+
+    async def enterRecording(self):
+        self.cancelTick() 
+        self.latchCounter() 
+        self.pump_is_busy = False 
+        self.cutoff.learn(self.readCounter(), self.cutoff_preset, self.params.pulses_per_liter, self.params.calibration_factor) 
+        self.sampleTimeline() 
+        self.flow_profile = self.timeline.profile(self.params.pulses_per_liter, self.params.calibration_factor) 
+        event = EndErogation(
+            self.side_number, self.readCounter(), self.flow_profile,
+            self.driver, self.vehicle, datetime.now(timezone.utc)
+        ) 
+        # the side stays in RECORDING until the journal append is fsync'd, queued signals wait for it
+        if self.recorder: 
+            try:
+                await self.recorder(event) 
+            except Exception as e: 
+                logging.error(f"[ERROR]: dispense not recorded for side {self.side_number}: {e}")
+                await self.bus.publish(RecordFailed(self.side_number)) 
+        await self.transition(PumpState.IDLE) 
+
+    def simulatePulses(self, now):
+        if now - self.dispense_started < SIM_PULSER_DELAY: 
+            return 
+        if self.sim_started is None: 
+            if self.readCounter() != 0: 
+                self.sim_started = False 
+                return 
+            logging.info("[INFO]: no physical impulse detected, start simulation") 
+            self.sim_started = now 
+        if self.sim_started is False: 
+            return 
+        pulses = int((now - self.sim_started) * SIM_PULSER_RATE) 
+        self.pulser_counter += pulses - self.sim_pulses 
+        self.sim_pulses = pulses 
+
+    async def dispenseTick(self):
+        now = self.loop.time() 
+        if self.state is PumpState.DISPENSING and self.acquisition is not None and not self.acquisition.ready: 
+            logging.error(f"[ERROR]: acquisition worker not available, stop dispensing for the side {self.side_number}")
+            await self.transition(PumpState.STOPPING) 
+            return 
+        if self.params.simulation_pulser and self.state is PumpState.DISPENSING: 
+            self.simulatePulses(now) 
+        self.sampleTimeline() 
+        if self.last_liters_update is None or now - self.last_liters_update >= LITERS_UPDATE_INTERVAL: 
+            liters = self.timeline_pulses / self.params.pulses_per_liter 
+            calibrated_liters = liters / self.params.calibration_factor 
+            await self.bus.publish(UpdateLiters(self.side_number, calibrated_liters)) 
+            self.last_liters_update = now 
+
+        if self.state is not PumpState.DISPENSING or not self.cutoff_preset: 
+            self.scheduleTick(TIMELINE_SAMPLE_INTERVAL) 
+            return 
+
+        if self.cut_due is None: 
+            delay = self.cutoff.update(now, self.readCounter()) 
+            if delay is None: 
+                self.scheduleTick(PRESET_POLL_INTERVAL) 
+                return 
+            if delay > 0: 
+                self.cut_due = now + delay 
+                self.scheduleTick(delay) 
+                return 
+        self.setRelay(0) 
+        self.cutoff.markCut(self.readCounter()) 
+        logging.info(f"[INFO]: preset reached, stop dispensing for the side {self.side_number}")
+        await self.transition(PumpState.STOPPING) 
+
+    def stateSummary(self) -> str:
+        parts = [
+            f"{state.value} {stats.count}x avg {stats.avg * 1000:.0f} ms max {stats.max * 1000:.0f} ms"
+            for state, stats in self.state_stats.items() if stats.count
+        ] 
+        return f"side {self.side_number} state {self.state.value}: {', '.join(parts) or 'no transitions'}; {self.signal_stats.summary()}"
+
+    def resetStateStats(self):
+        for stats in self.state_stats.values(): 
+            stats.reset() 
+        self.signal_stats.reset() 
 
     def close(self):
-        if self.pi: 
-            self.pi.write(self.params.relay_pin, 0) 
-            self.pi.stop() 
-            logging.info(f"[INFO]: gpio resources released for side {self.side_number}.")
\ No newline at end of file
+        self.cancelTimer() 
+        self.cancelTick() 
+        self.setRelay(0) 
+        if self.acquisition is not None: 
+            self.acquisition.close() 
+            logging.info(f"[INFO]: acquisition worker closed for side {self.side_number}.")
+        if self.cutoff_script: 
+            self.cutoff_script.close() 
+            self.cutoff_script = None 
+        logging.info(f"[INFO]: gpio resources released for side {self.side_number}.")
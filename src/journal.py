@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# payload length, crc32 of the payload
+RECORD_HEADER = struct.Struct("<II")
+SEGMENT_SUFFIX = ".seg"
+DEAD_LETTER_FILE = "dead_letter.jsonl"
+SEGMENT_MAX_BYTES = 1024 * 1024
+MAX_RECORD_BYTES = 64 * 1024
+
+
+class Journal:
+    def __init__(self, path: str = "data/journal", segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.checkpoint_path = self.path / "checkpoint.json"
+        self.dead_letter_path = self.path / DEAD_LETTER_FILE
+        self.lock = threading.Lock()
+        self.file = None
+        self.appended = 0
+        self.cursor = self.loadCheckpoint()
+        self.recover()
+
+    def segmentPath(self, number: int) -> Path:
+        return self.path / f"{number:010d}{SEGMENT_SUFFIX}"
+
+    def segments(self):
+        return sorted(int(p.stem) for p in self.path.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def loadCheckpoint(self):
+        try:
+            if self.checkpoint_path.exists():
+                with open(self.checkpoint_path, 'r') as f:
+                    checkpoint = json.load(f)
+                return checkpoint["segment"], checkpoint["offset"]
+        except Exception as e:
+            logging.error(f"[ERROR]: journal checkpoint unreadable, replaying from the oldest segment: {e}")
+        segments = self.segments()
+        return (segments[0] if segments else 1), 0
+
+    def saveCheckpoint(self):
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"segment": self.cursor[0], "offset": self.cursor[1]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self.syncDirectory()
+
+    def syncDirectory(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def scan(self, number: int, start: int = 0, stop: int = None):
+        with open(self.segmentPath(number), 'rb') as f:
+            f.seek(start)
+            offset = start
+            while stop is None or offset < stop:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    if header:
+                        logging.warning(f"[WARNING]: journal segment {number} has a torn header at {offset}")
+                    return
+                length, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length) if length <= MAX_RECORD_BYTES else b""
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    logging.warning(f"[WARNING]: journal segment {number} has a bad record at {offset}")
+                    return
+                offset += RECORD_HEADER.size + length
+                yield offset, payload
+
+    def recover(self):
+        segments = self.segments()
+        self.active = segments[-1] if segments else max(self.cursor[0], 1)
+        end = 0
+        if segments:
+            for end, _ in self.scan(self.active):
+                pass
+            size = self.segmentPath(self.active).stat().st_size
+            if size > end:
+                logging.warning(f"[WARNING]: truncating {size - end} bytes of torn writes from journal segment {self.active}")
+                with open(self.segmentPath(self.active), 'r+b') as f:
+                    f.truncate(end)
+                    os.fsync(f.fileno())
+        self.file = open(self.segmentPath(self.active), 'ab')
+        self.active_size = end
+        self.syncDirectory()
+        logging.info(f"[INFO]: journal opened at segment {self.active}, replay cursor {self.cursor}")
+
+    def rotate(self):
+        self.file.close()
+        self.active += 1
+        self.file = open(self.segmentPath(self.active), 'ab')
+        self.active_size = 0
+        self.syncDirectory()
+
+    def append(self, entry: dict):
+        payload = json.dumps(entry, separators=(",", ":")).encode()
+        if len(payload) > MAX_RECORD_BYTES:
+            raise ValueError(f"journal entry too large ({len(payload)} bytes)")
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self.lock:
+            if self.active_size and self.active_size + len(record) > self.segment_max_bytes:
+                self.rotate()
+            self.file.write(record)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.active_size += len(record)
+            self.appended += 1
+
+    def reject(self, position, entry: dict, reason: str):
+        record = {"segment": position[0], "offset": position[1], "reason": reason, "entry": entry}
+        with self.lock, open(self.dead_letter_path, 'a') as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        logging.error(f"[ERROR]: journal entry at {position} moved to {self.dead_letter_path}: {reason}")
+
+    def read(self, limit: int):
+        with self.lock:
+            end_segment, end_offset = self.active, self.active_size
+        entries = []
+        segment, offset = self.cursor
+        for number in self.segments():
+            if number < segment or number > end_segment:
+                continue
+            start = offset if number == segment else 0
+            stop = end_offset if number == end_segment else None
+            for position, payload in self.scan(number, start, stop):
+                entries.append(((number, position), json.loads(payload)))
+                if len(entries) >= limit:
+                    return entries
+        return entries
+
+    def commit(self, position):
+        self.cursor = position
+        self.saveCheckpoint()
+        self.compact()
+
+    def compact(self):
+        for number in self.segments():
+            if number >= self.cursor[0] or number == self.active:
+                break
+            self.segmentPath(number).unlink()
+            logging.info(f"[INFO]: journal segment {number} fully applied, removed")
+
+    def backlogSegments(self) -> int:
+        return sum(1 for number in self.segments() if number >= self.cursor[0])
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
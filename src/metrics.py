@@ -0,0 +1,37 @@
+class LatencyStats:
+    def __init__(self, name: str, budget: float = None):
+        self.name = name
+        self.budget = budget
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.over_budget = 0
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.budget is not None and value > self.budget:
+            self.over_budget += 1
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.avg * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "over_budget": self.over_budget,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: avg {self.avg * 1000:.2f} ms, max {self.max * 1000:.2f} ms, "
+            f"over budget {self.over_budget}/{self.count}"
+        )
@@ -0,0 +1,93 @@
+from array import array
+
+TICK_MASK = 0xFFFFFFFF
+TIMELINE_CAPACITY = 8192
+
+
+class PulseTimeline:
+    def __init__(self, capacity: int = TIMELINE_CAPACITY):
+        self.capacity = capacity
+        self.deltas = array('I')
+        self.counts = array('I')
+        self.reset(0)
+
+    def reset(self, start_tick: int):
+        del self.deltas[:]
+        del self.counts[:]
+        self.start_tick = start_tick & TICK_MASK
+        self.last_tick = self.start_tick
+        self.stride = 1
+        self.pending = 0
+        self.pending_tick = self.start_tick
+        self.first_tick = None
+
+    def record(self, tick: int, count: int = 1):
+        if self.first_tick is None:
+            self.first_tick = tick & TICK_MASK
+        self.pending += count
+        self.pending_tick = tick & TICK_MASK
+        if self.pending >= self.stride:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.deltas.append((self.pending_tick - self.last_tick) & TICK_MASK)
+        self.counts.append(self.pending)
+        self.last_tick = self.pending_tick
+        self.pending = 0
+        if len(self.deltas) >= self.capacity:
+            self.compact()
+
+    def compact(self):
+        deltas = array('I', (self.deltas[i] + self.deltas[i + 1] for i in range(0, len(self.deltas) - 1, 2)))
+        counts = array('I', (self.counts[i] + self.counts[i + 1] for i in range(0, len(self.counts) - 1, 2)))
+        if len(self.deltas) % 2:
+            deltas.append(self.deltas[-1])
+            counts.append(self.counts[-1])
+        self.deltas, self.counts = deltas, counts
+        self.stride *= 2
+
+    def profile(self, pulses_per_liter: float, calibration_factor: float, points: int = 60):
+        self.flush()
+        if not self.counts:
+            return None
+
+        offsets = []
+        elapsed = 0
+        for delta in self.deltas:
+            elapsed += delta
+            offsets.append(elapsed / 1000000)
+
+        start_lag = ((self.first_tick - self.start_tick) & TICK_MASK) / 1000000
+        duration = offsets[-1] - start_lag
+        pulses_per_unit = pulses_per_liter * calibration_factor
+        total_liters = sum(self.counts) / pulses_per_unit
+        if duration <= 0:
+            return {
+                "start_lag_s": round(start_lag, 3),
+                "duration_s": 0.0,
+                "min_flow_lpm": 0.0,
+                "avg_flow_lpm": 0.0,
+                "peak_flow_lpm": 0.0,
+                "bin_seconds": 0.0,
+                "curve": [],
+            }
+
+        bins = min(points, len(offsets))
+        bin_seconds = duration / bins
+        pulses = [0] * bins
+        for offset, count in zip(offsets, self.counts):
+            pulses[min(max(int((offset - start_lag) / bin_seconds), 0), bins - 1)] += count
+
+        curve = [round(p / pulses_per_unit / bin_seconds * 60, 2) for p in pulses]
+        flowing = [f for f in curve if f > 0] or [0.0]
+        return {
+            "start_lag_s": round(start_lag, 3),
+            "duration_s": round(duration, 3),
+            "min_flow_lpm": min(flowing),
+            "avg_flow_lpm": round(total_liters / duration * 60, 2),
+            "peak_flow_lpm": max(curve),
+            "bin_seconds": round(bin_seconds, 3),
+            "curve": curve,
+        }
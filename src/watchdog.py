@@ -0,0 +1,97 @@
+import logging
+import time
+import pigpio
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# p0 pulser gpio, p1 relay gpio, p2 preset pulses, p3 no-flow timeout (us), p4 event id
+# on exit: p8 pulses counted by the script, p9 reason (1 preset reached, 2 no flow)
+CUTOFF_SCRIPT = """
+ld v0 0
+ld p9 0
+r p0
+sta v1
+tick
+sta v2
+tag 1
+r p0
+sta v3
+cmp v1
+jz 2
+lda v3
+sta v1
+cmp 0
+jnz 2
+inr v0
+tick
+sta v2
+lda v0
+cmp p2
+jm 2
+ld p9 1
+jmp 9
+tag 2
+tick
+sub v2
+cmp p3
+jm 3
+ld p9 2
+jmp 9
+tag 3
+mics 100
+jmp 1
+tag 9
+w p1 0
+lda v0
+sta p8
+evt p4
+halt
+"""
+
+REASON_PRESET = 1
+REASON_NO_FLOW = 2
+NO_PRESET = 0x7FFFFFFF
+
+
+class CutoffScript:
+    def __init__(self, pi, params, side_number, on_cutoff):
+        self.pi = pi
+        self.params = params
+        self.side_number = side_number
+        self.on_cutoff = on_cutoff
+        self.event_id = side_number
+        self.script_id = self.pi.store_script(CUTOFF_SCRIPT.encode())
+        if self.script_id < 0:
+            raise RuntimeError(f"pigpio rejected cutoff script: {pigpio.error_text(self.script_id)}")
+        self.event_cb = self.pi.event_callback(self.event_id, self.scriptFinished)
+        self.waitReady()
+        logging.info(f"[INFO]: daemon cutoff script stored for side {self.side_number}")
+
+    def waitReady(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while self.pi.script_status(self.script_id)[0] == pigpio.PI_SCRIPT_INITING:
+            if time.monotonic() > deadline:
+                raise RuntimeError("cutoff script still initialising")
+            time.sleep(0.01)
+
+    def start(self, preset_pulses: int, no_flow_timeout: float):
+        threshold = int(preset_pulses) if preset_pulses > 0 else NO_PRESET
+        timeout_us = int(no_flow_timeout * 1000000) if no_flow_timeout > 0 else NO_PRESET
+        self.pi.run_script(self.script_id, [
+            self.params.pulser_pin, self.params.relay_pin, threshold, timeout_us, self.event_id
+        ])
+
+    def stop(self):
+        if self.pi.script_status(self.script_id)[0] == pigpio.PI_SCRIPT_RUNNING:
+            self.pi.stop_script(self.script_id)
+
+    def scriptFinished(self, event, tick):
+        _, script_params = self.pi.script_status(self.script_id)
+        pulses, reason = script_params[8], script_params[9]
+        logging.info(f"[INFO]: daemon cutoff fired for side {self.side_number}, reason {reason}, pulses {pulses}")
+        self.on_cutoff(reason, pulses)
+
+    def close(self):
+        self.stop()
+        self.event_cb.cancel()
+        self.pi.delete_script(self.script_id)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import engine
+from app.crud.erogations import insertErogations
+from app.crud.totals import recordTotals
+from app.crud.rollups import recordRollups
+from app.crud.flow_profiles import insertFlowProfiles
+from app.crud.retention import ensurePartitions
+from app.crud.notify import notifyChange
+from app.schemas.erogations import ErogationCreate
+from app.schemas.flow_profiles import FlowProfileCreate
+from src.metrics import LatencyStats
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+WRITER_BATCH_SIZE = 50
+COMMIT_BUDGET = 0.1
+IDLE_POLL_INTERVAL = 30
+PARTITION_CHECK_INTERVAL = 6 * 3600
+RETRY_MIN_DELAY = 1
+RETRY_MAX_DELAY = 60
+# errors that retrying the same entry can never fix, unlike a lost connection
+DATA_ERRORS = (ValidationError, IntegrityError, DataError, KeyError, TypeError, ValueError)
+
+
+class RecordWriter:
+    def __init__(self, journal, flush_window: float = 0.5, batch_size: int = WRITER_BATCH_SIZE):
+        self.journal = journal
+        self.flush_window = flush_window
+        self.batch_size = batch_size
+        self.connection = None
+        self.wakeup = asyncio.Event()
+        self.next_partition_check = 0
+        self.delay = RETRY_MIN_DELAY
+        self.applied = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.failures = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.max_batch = 0
+        self.commit_stats = LatencyStats("record commit", COMMIT_BUDGET)
+
+    def wake(self):
+        self.wakeup.set()
+
+    async def connect(self):
+        if self.connection is None or self.connection.closed:
+            self.connection = await engine.connect()
+            logging.info("[INFO]: record writer connection opened.")
+        return self.connection
+
+    async def closeConnection(self):
+        if self.connection is None:
+            return
+        try:
+            await self.connection.close()
+        except Exception as e:
+            logging.error(f"[ERROR]: record writer connection not closed cleanly: {e}")
+        self.connection = None
+
+    async def writeBatch(self, entries):
+        rows = [
+            {**ErogationCreate(**entry["erogation"]).dict(), "idempotency_key": entry["key"]}
+            for _, entry in entries
+        ]
+        connection = await self.connect()
+        start = asyncio.get_running_loop().time()
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            inserted = await insertErogations(session, rows)
+            await recordRollups(
+                session,
+                list(inserted.values()),
+                [row["erogation_timestamp"] for row in rows if row["idempotency_key"] in inserted]
+            )
+
+            totals = defaultdict(Decimal)
+            profiles = []
+            for _, entry in entries:
+                erogation_id = inserted.get(entry["key"])
+                if erogation_id is None:
+                    continue
+                totals[(entry["dispenser_id"], entry["side"])] += Decimal(entry["liters"])
+                if entry.get("profile"):
+                    profiles.append({"erogation_id": erogation_id, **FlowProfileCreate(**entry["profile"]).dict()})
+
+            for (dispenser_id, side), liters in sorted(totals.items()):
+                await recordTotals(session, dispenser_id=dispenser_id, side=side, liters=liters)
+            await insertFlowProfiles(session, profiles)
+            if inserted:
+                await notifyChange(session, "erogations", None)
+            await session.commit()
+        self.commit_stats.record(asyncio.get_running_loop().time() - start)
+        return len(inserted)
+
+    async def checkPartitions(self):
+        connection = await self.connect()
+        async with AsyncSession(bind=connection) as session:
+            created = await ensurePartitions(session)
+        for name, moved in created:
+            logging.info(f"[INFO]: created erogations partition {name}, {moved} rows moved from the default partition")
+
+    async def rollback(self):
+        if self.connection is not None and self.connection.in_transaction():
+            await self.connection.rollback()
+
+    async def writeEntries(self, entries):
+        try:
+            return await self.writeBatch(entries), 0
+        except DATA_ERRORS as e:
+            await self.rollback()
+            logging.warning(f"[WARNING]: batch of {len(entries)} dispenses rejected ({e}), writing them one by one")
+
+        loop = asyncio.get_running_loop()
+        inserted = rejected = 0
+        for position, entry in entries:
+            try:
+                inserted += await self.writeBatch([(position, entry)])
+            except DATA_ERRORS as e:
+                await self.rollback()
+                await loop.run_in_executor(None, self.journal.reject, position, entry, str(e))
+                rejected += 1
+        return inserted, rejected
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if loop.time() >= self.next_partition_check:
+                try:
+                    await self.checkPartitions()
+                    self.next_partition_check = loop.time() + PARTITION_CHECK_INTERVAL
+                except Exception as e:
+                    logging.error(f"[ERROR]: erogations partition check failed: {e}")
+                    await self.closeConnection()
+                    self.next_partition_check = loop.time() + self.delay
+            self.wakeup.clear()
+            entries = await loop.run_in_executor(None, self.journal.read, self.batch_size)
+            if not entries:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), IDLE_POLL_INTERVAL)
+                    await asyncio.sleep(self.flush_window)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                inserted, rejected = await self.writeEntries(entries)
+            except Exception as e:
+                self.failures += 1
+                logging.error(f"[ERROR]: writing {len(entries)} dispenses failed, retrying in {self.delay}s: {e}")
+                await self.closeConnection()
+                await asyncio.sleep(self.delay)
+                self.delay = min(self.delay * 2, RETRY_MAX_DELAY)
+                continue
+
+            self.delay = RETRY_MIN_DELAY
+            await loop.run_in_executor(None, self.journal.commit, entries[-1][0])
+            self.applied += inserted
+            self.rejected += rejected
+            self.duplicates += len(entries) - inserted - rejected
+            self.batches += 1
+            self.batch_rows += len(entries)
+            self.max_batch = max(self.max_batch, len(entries))
+            logging.info(f"[INFO]: record writer committed {inserted}/{len(entries)} dispenses up to {entries[-1][0]}")
+
+    def summary(self) -> str:
+        avg_batch = self.batch_rows / self.batches if self.batches else 0.0
+        return (
+            f"record writer: appended {self.journal.appended}, applied {self.applied}, duplicates {self.duplicates}, "
+            f"dead-lettered {self.rejected}, failed batches {self.failures}, backlog segments {self.journal.backlogSegments()}, "
+            f"batches {self.batches} (avg {avg_batch:.1f}, max {self.max_batch} rows), {self.commit_stats.summary()}"
+        )
+
+    def resetStats(self):
+        self.batches = 0
+        self.batch_rows = 0
+        self.max_batch = 0
+        self.commit_stats.reset()
+
+    async def close(self):
+        await self.closeConnection()